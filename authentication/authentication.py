@@ -1,9 +1,19 @@
+import copy
 import jwt
 from django.conf import settings
+from usAHA_backend.lru import TTLCache
 from .models import CustomUser
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+# Resolved users keyed by (user id, token iat), so most requests skip the user query.
+user_cache = TTLCache(maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+                      ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60))
+
+def invalidate_user(user_id):
+    user_id = str(user_id)
+    user_cache.delete_where(lambda key: key[0] == user_id)
+
 class JWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
         token = request.COOKIES.get('jwt')
@@ -15,8 +25,13 @@ class JWTAuthentication(BaseAuthentication):
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Unauthenticated')
 
-        user = CustomUser.objects.filter(id=payload['id']).first()
+        key = (str(payload['id']), payload.get('iat'))
+        user = user_cache.get(key)
         if user is None:
-            raise AuthenticationFailed('User not found')
+            user = CustomUser.objects.filter(id=payload['id']).first()
+            if user is None:
+                raise AuthenticationFailed('User not found')
+            user_cache.set(key, user)
 
-        return (user, None)
\ No newline at end of file
+        # A copy per request, so changes made while handling one never leak into another.
+        return (copy.copy(user), None)
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 import uuid
 
 class CustomUser(AbstractUser):
@@ -8,4 +10,11 @@ class CustomUser(AbstractUser):
     email = models.EmailField(max_length=40, unique=True)
 
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Imported here because the authentication backend imports this module.
+    from .authentication import invalidate_user
+    invalidate_user(instance.pk)
@@ -8,4 +8,5 @@ urlpatterns = [
     path('logout/', LogoutAPIView.as_view(), name='logout'),
     path('user/', UserAPIView.as_view(), name='user'),
     path('users/', UserListAPIView.as_view(), name='users'),
+    path('cache-stats/', UserCacheStatsAPIView.as_view(), name='user-cache-stats'),
 ]
\ No newline at end of file
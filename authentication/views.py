@@ -4,8 +4,9 @@ from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import AuthenticationFailed
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.decorators import permission_classes
+from .authentication import invalidate_user, user_cache
 from .serializers import CustomUserSerializer
 from user_profile.models import Profile
 from user_profile.serializers import ProfileSerializer
@@ -76,6 +77,7 @@ class LogoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        invalidate_user(request.user.pk)
         logout(request)
         response = Response()
         response.delete_cookie(
@@ -140,9 +142,11 @@ class UserListAPIView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [IsAuthenticated]
+    ordering = ['-date_joined']
 
+class UserCacheStatsAPIView(APIView):
+    """Hit/miss counters of this worker's authentication user cache."""
+    permission_classes = [IsAdminUser]
 
-
-
-
-
+    def get(self, request):
+        return Response(user_cache.stats())
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from facility_rental.models import Facility
+from tool_marketplace.models import Tool
+from autocomplete.models import Suggestion, normalize
+
+class Command(BaseCommand):
+    help = "Rebuild the autocomplete suggestions from facilities and tools."
+
+    def handle(self, *args, **options):
+        suggestions = []
+        cities = {}
+        for pk, name, city in Facility.objects.values_list('pk', 'name', 'city').iterator():
+            suggestions.append(Suggestion(kind='facility', key=str(pk), term=normalize(name), label=name))
+            label, count = cities.get(normalize(city), (city.strip(), 0))
+            cities[normalize(city)] = (min(label, city.strip()), count + 1)
+        for pk, name in Tool.objects.values_list('pk', 'name').iterator():
+            suggestions.append(Suggestion(kind='tool', key=str(pk), term=normalize(name), label=name))
+        for key, (label, count) in cities.items():
+            suggestions.append(Suggestion(kind='city', key=key, term=key, label=label, weight=count))
+
+        with transaction.atomic():
+            Suggestion.objects.all().delete()
+            Suggestion.objects.bulk_create(suggestions, batch_size=1000)
+        self.stdout.write(f"Indexed {len(suggestions)} suggestions")
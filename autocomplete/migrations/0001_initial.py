@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('facility_rental', '0010_facility_search_vector'),
+        ('tool_marketplace', '0002_tool_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Suggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('facility', 'Facility'), ('city', 'City'), ('tool', 'Tool')], max_length=10)),
+                ('key', models.CharField(max_length=255)),
+                ('term', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=255)),
+                ('weight', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term'], name='suggestion_term_prefix_idx', opclasses=['varchar_pattern_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='suggestion_kind_key_unique')],
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO autocomplete_suggestion (kind, key, term, label, weight)
+                SELECT 'facility', uuid::text, lower(trim(name)), name, 1
+                FROM facility_rental_facility
+                UNION ALL
+                SELECT 'tool', uuid::text, lower(trim(name)), name, 1
+                FROM tool_marketplace_tool
+                UNION ALL
+                SELECT 'city', city_key, city_key, min(trim(city)), count(*)
+                FROM (
+                    SELECT city, lower(trim(city)) AS city_key
+                    FROM facility_rental_facility
+                ) AS cities
+                GROUP BY city_key;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from facility_rental.models import Facility
+from tool_marketplace.models import Tool
+
+class Suggestion(models.Model):
+    """
+    One row per typeahead entry: every facility, every tool and every distinct
+    facility city. Lookups are prefix matches on the lower-cased `term`.
+    """
+    KIND_CHOICES = [
+        ('facility', 'Facility'),
+        ('city', 'City'),
+        ('tool', 'Tool'),
+    ]
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255)
+    term = models.CharField(max_length=255)
+    label = models.CharField(max_length=255)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='suggestion_kind_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['term'], name='suggestion_term_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+def normalize(text):
+    return text.strip().lower()
+
+def add_city(city):
+    key = normalize(city)
+    if Suggestion.objects.filter(kind='city', key=key).update(weight=F('weight') + 1):
+        return
+    try:
+        with transaction.atomic():
+            Suggestion.objects.create(kind='city', key=key, term=key, label=city.strip())
+    except IntegrityError:
+        # Created concurrently by another facility in the same city.
+        Suggestion.objects.filter(kind='city', key=key).update(weight=F('weight') + 1)
+
+def remove_city(city):
+    key = normalize(city)
+    if not Suggestion.objects.filter(kind='city', key=key, weight__gt=1).update(weight=F('weight') - 1):
+        Suggestion.objects.filter(kind='city', key=key).delete()
+
+@receiver(post_init, sender=Facility)
+def remember_facility_city(sender, instance, **kwargs):
+    # The city as loaded, so a save can move its weight without a lookup.
+    instance._stored_city = instance.__dict__.get('city')
+
+@receiver(post_save, sender=Facility)
+def index_facility(sender, instance, created, **kwargs):
+    Suggestion.objects.bulk_create(
+        [Suggestion(kind='facility', key=str(instance.pk), term=normalize(instance.name), label=instance.name)],
+        update_conflicts=True, unique_fields=['kind', 'key'], update_fields=['term', 'label'],
+    )
+    if created:
+        add_city(instance.city)
+    # With city deferred there is no stored value; rebuild_autocomplete recounts if that ever drifts.
+    elif instance._stored_city is not None and normalize(instance._stored_city) != normalize(instance.city):
+        remove_city(instance._stored_city)
+        add_city(instance.city)
+    instance._stored_city = instance.city
+
+@receiver(post_delete, sender=Facility)
+def unindex_facility(sender, instance, **kwargs):
+    Suggestion.objects.filter(kind='facility', key=str(instance.pk)).delete()
+    remove_city(instance.city)
+
+@receiver(post_save, sender=Tool)
+def index_tool(sender, instance, **kwargs):
+    Suggestion.objects.update_or_create(
+        kind='tool', key=str(instance.pk),
+        defaults={'term': normalize(instance.name), 'label': instance.name},
+    )
+
+@receiver(post_delete, sender=Tool)
+def unindex_tool(sender, instance, **kwargs):
+    Suggestion.objects.filter(kind='tool', key=str(instance.pk)).delete()
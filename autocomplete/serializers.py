@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from .models import Suggestion
+
+class SuggestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Suggestion
+        fields = ['kind', 'key', 'label']
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import *
+
+urlpatterns = [
+    path('', AutocompleteAPIView.as_view(), name='autocomplete'),
+]
@@ -0,0 +1,27 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from .models import Suggestion, normalize
+from .serializers import SuggestionSerializer
+
+class AutocompleteAPIView(APIView):
+    permission_classes = [AllowAny]
+    default_limit = 8
+    max_limit = 20
+
+    def get(self, request, format=None):
+        prefix = normalize(request.query_params.get('q', ''))
+        if not prefix:
+            return Response([])
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({"message": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        suggestions = Suggestion.objects.filter(term__startswith=prefix)
+        kind = request.query_params.get('kind')
+        if kind:
+            suggestions = suggestions.filter(kind=kind)
+        suggestions = suggestions.order_by('-weight', 'term').only('kind', 'key', 'label')[:max(limit, 0)]
+        return Response(SuggestionSerializer(suggestions, many=True).data)
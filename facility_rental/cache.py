@@ -0,0 +1,79 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Error, Tags, register
+from django.db import transaction
+from usAHA_backend.conditional import ConditionalGetMixin
+
+VERSION_KEY = 'facility_rental:version'
+
+def media_safe_timeout(seconds):
+    """
+    Cap the lifetime of a cached body that embeds signed media URLs. The URL
+    cache only hands out URLs with MEDIA_URL_CACHE_MARGIN seconds left, which
+    has to outlast this cache plus the HTTP max-age served on top of it.
+    """
+    return max(min(seconds, settings.MEDIA_URL_CACHE_MARGIN - ConditionalGetMixin.cache_max_age), 0)
+
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Version bumps only reach other workers through a cache they share."""
+    if settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS:
+        return []
+    return [Error(
+        "The default cache is local to each process, so a write in one worker "
+        "does not invalidate cached facility data in the others.",
+        hint="Set CACHE_BACKEND (and CACHE_LOCATION) to a shared cache such as "
+             "django.core.cache.backends.redis.RedisCache.",
+        id='facility_rental.E001',
+    )]
+
+FACETS_TIMEOUT = 300
+TOP_FEED_TIMEOUT = media_safe_timeout(600)
+DETAIL_TIMEOUT = media_safe_timeout(900)
+
+def get_version():
+    """Current generation of cached facility data; bumping it orphans every entry built on the old one."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock rather than 1 so an evicted counter never
+        # comes back to a generation that still has entries cached.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+def bump_version():
+    def bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+    # After commit, so a concurrent read cannot cache pre-commit rows under the new version.
+    transaction.on_commit(bump)
+
+def filter_key(params, names):
+    """Stable digest of the non-empty query parameters that the filter set understands."""
+    items = sorted((name, value.strip()) for name in names for value in params.getlist(name) if value.strip())
+    return hashlib.md5(urlencode(items).encode('utf-8')).hexdigest()
+
+def facets_key(params, names):
+    return f"facility_facets:{get_version()}:{filter_key(params, names)}"
+
+def top_feed_key(count):
+    return f"facility_top:{get_version()}:{count}"
+
+def detail_key(pk):
+    return f"facility_detail:{pk}"
+
+def invalidate_detail(*pks):
+    keys = [detail_key(pk) for pk in pks]
+    # Deleted again after commit, in case a read in between re-cached the old row.
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
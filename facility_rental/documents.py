@@ -0,0 +1,74 @@
+from django.core.files.storage import default_storage
+from django.db import transaction, IntegrityError
+from .models import Facility, FacilityDocument
+from .serializers import AmenitySerializer, FacilityDocumentSerializer, FacilityImageSerializer
+
+# jsonb does not keep key order, so documents are laid out again in serializer field order.
+FIELDS = FacilityDocumentSerializer.Meta.fields
+AMENITY_FIELDS = AmenitySerializer.Meta.fields
+IMAGE_FIELDS = FacilityImageSerializer.Meta.fields
+
+def refresh_documents(facility_ids, create=False):
+    """
+    Re-render the stored documents of these facilities. Without `create` only
+    existing documents are rewritten, so a facility being deleted in the same
+    transaction never gets one back.
+    """
+    facilities = Facility.objects.for_document().filter(pk__in=facility_ids)
+    if not create:
+        facilities = facilities.filter(document__isnull=False)
+    documents = [FacilityDocument(facility=facility, data=FacilityDocumentSerializer(facility).data)
+                 for facility in facilities]
+    if create:
+        FacilityDocument.objects.bulk_create(documents, update_conflicts=True,
+                                             unique_fields=['facility'], update_fields=['data'])
+    elif documents:
+        FacilityDocument.objects.bulk_update(documents, ['data'])
+    return documents
+
+def load_documents(facilities):
+    """
+    Stored document data by facility pk, for facilities fetched with
+    select_related('document'). Any without a document (e.g. rows inserted
+    with bulk_create) are built and stored in one batch.
+    """
+    documents = {}
+    for facility in facilities:
+        document = getattr(facility, 'document', None)
+        if document is not None:
+            documents[facility.pk] = document.data
+    missing = [facility.pk for facility in facilities if facility.pk not in documents]
+    if missing:
+        try:
+            with transaction.atomic():
+                built = refresh_documents(missing, create=True)
+        except IntegrityError:
+            # A facility was deleted meanwhile; serve the rest without storing them.
+            built = [FacilityDocument(facility=facility, data=FacilityDocumentSerializer(facility).data)
+                     for facility in Facility.objects.for_document().filter(pk__in=missing)]
+        documents.update((document.facility_id, document.data) for document in built)
+    return documents
+
+def media_url(name, request=None):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+def render_document(facility, stored, request=None):
+    """The FacilitySerializer payload of a facility from its stored document data."""
+    data = {field: stored[field] for field in FIELDS}
+    data['owner_pfp'] = media_url(data['owner_pfp'])
+    data['amenities'] = [{field: amenity[field] for field in AMENITY_FIELDS} for amenity in data['amenities']]
+    data['images'] = [{**{field: image[field] for field in IMAGE_FIELDS}, 'image': media_url(image['image'], request)}
+                      for image in data['images']]
+    # Only set on proximity queries, in km.
+    distance = getattr(facility, 'distance', None)
+    data['distance'] = round(distance, 2) if distance is not None else None
+    return data
+
+def render_documents(facilities, request=None):
+    facilities = list(facilities)
+    documents = load_documents(facilities)
+    return [render_document(facility, documents[facility.pk], request)
+            for facility in facilities if facility.pk in documents]
@@ -0,0 +1,117 @@
+import json
+from urllib.parse import parse_qsl
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.generics import ListAPIView
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+User = get_user_model()
+
+class Rollback(Exception):
+    pass
+
+def list_endpoints(patterns, prefix='/'):
+    """Yield (path, view class) for every parameterless ListAPIView route."""
+    for pattern in patterns:
+        route = str(pattern.pattern)
+        if '<' in route or getattr(pattern.pattern, 'regex', None) and pattern.pattern.regex.groups:
+            continue
+        if isinstance(pattern, URLResolver):
+            yield from list_endpoints(pattern.url_patterns, prefix + route)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None and issubclass(view_class, ListAPIView):
+                yield prefix + route, view_class
+
+def walk_plan(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from walk_plan(child)
+
+class Command(BaseCommand):
+    help = ("Run EXPLAIN (ANALYZE, BUFFERS) on the first page query of every list endpoint "
+            "and flag sequential scans that read more than a row threshold.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username or email to authenticate as, for endpoints scoped to request.user.")
+        parser.add_argument('--query', default='', help="Query string applied to every endpoint, e.g. 'city=Depok&page_size=50'.")
+        parser.add_argument('--path', default='', help="Only audit endpoints whose path contains this.")
+        parser.add_argument('--threshold', type=int, default=1000,
+                            help="Flag sequential scans reading at least this many rows.")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full JSON plan of each query.")
+        parser.add_argument('--strict', action='store_true', help="Exit with an error if anything is flagged.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("audit_queries needs PostgreSQL for EXPLAIN (ANALYZE, BUFFERS).")
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first() or \
+                User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"User not found: {options['user']}")
+
+        flagged = 0
+        for path, view_class in list_endpoints(get_resolver().url_patterns):
+            if options['path'] not in path:
+                continue
+            try:
+                plan = self.explain(path, view_class, user, options['query'])
+            except Exception as e:
+                self.stdout.write(f"{path:<40} skipped: {e}")
+                continue
+
+            root = plan['Plan']
+            scans = [node for node in walk_plan(root) if node['Node Type'] == 'Seq Scan'
+                     and self.rows_read(node) >= options['threshold']]
+            flagged += len(scans)
+            self.stdout.write(
+                f"{path:<40} {plan['Execution Time']:>9.2f} ms  "
+                f"hit={root.get('Shared Hit Blocks', 0)} read={root.get('Shared Read Blocks', 0)}"
+            )
+            for node in scans:
+                self.stdout.write(self.style.WARNING(
+                    f"    Seq Scan on {node['Relation Name']} read {self.rows_read(node)} rows"
+                    + (f", filter: {node['Filter']}" if 'Filter' in node else "")
+                ))
+            if options['verbose_plans']:
+                self.stdout.write(json.dumps(plan, indent=2))
+
+        if flagged and options['strict']:
+            raise CommandError(f"{flagged} sequential scan(s) over the threshold")
+
+    def rows_read(self, node):
+        loops = node.get('Actual Loops', 1)
+        return (node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)) * loops
+
+    def explain(self, path, view_class, user, query):
+        request = APIRequestFactory().get(path, dict(parse_qsl(query)))
+        if user is not None:
+            force_authenticate(request, user=user)
+
+        view = view_class()
+        view.setup(request)
+        view.format_kwarg = None
+        view.request = view.initialize_request(request)
+        view.check_permissions(view.request)
+
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        if paginator is not None:
+            # Explain what the paginator would run: the ordered first page.
+            page_size = paginator.get_page_size(view.request) or 0
+            if hasattr(paginator, 'get_ordering'):
+                queryset = queryset.order_by(*paginator.get_ordering(view.request, queryset, view))
+            queryset = queryset[:page_size + 1]
+
+        # ANALYZE executes the query; keep anything it might touch out of the database.
+        try:
+            with transaction.atomic():
+                plan = json.loads(queryset.explain(format='json', analyze=True, buffers=True))[0]
+                raise Rollback
+        except Rollback:
+            pass
+        return plan
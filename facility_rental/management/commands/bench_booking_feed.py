@@ -0,0 +1,71 @@
+import datetime
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from facility_rental.models import Facility, Facility_Booking, Facility_Image, FacilityReview
+from facility_rental.serializers import FacilityBookingSerializer
+
+User = get_user_model()
+
+BOOKINGS_PER_FACILITY = 100
+
+class Rollback(Exception):
+    pass
+
+class Command(BaseCommand):
+    help = "Time booking feed serialization for growing numbers of bookings. All data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+        parser.add_argument('--naive', action='store_true',
+                            help="Also time the plain queryset without for_feed() for comparison.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'bookings':>10} {'path':>8} {'queries':>8} {'total ms':>10} {'us/row':>8}")
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    booker = self.populate(size)
+                    self.run(size, 'feed', Facility_Booking.objects.for_feed().filter(booker=booker))
+                    if options['naive']:
+                        self.run(size, 'naive', Facility_Booking.objects.filter(booker=booker))
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def populate(self, size):
+        owner = User.objects.create(username='bench-owner', email='bench-owner@example.com')
+        booker = User.objects.create(username='bench-booker', email='bench-booker@example.com')
+        facilities = Facility.objects.bulk_create([
+            Facility(owner=owner, name=f"Bench facility {i}", city="Bench", location_link="")
+            for i in range((size + BOOKINGS_PER_FACILITY - 1) // BOOKINGS_PER_FACILITY)
+        ])
+        Facility_Image.objects.bulk_create([
+            Facility_Image(facility=facility, image=f"facility_images/bench-{i}.jpg", is_primary=True)
+            for i, facility in enumerate(facilities)
+        ])
+        start = datetime.date(2000, 1, 1)
+        bookings = Facility_Booking.objects.bulk_create([
+            Facility_Booking(
+                facility=facilities[i // BOOKINGS_PER_FACILITY],
+                booker=booker,
+                start_date=start + datetime.timedelta(days=2 * i),
+                end_date=start + datetime.timedelta(days=2 * i),
+            )
+            for i in range(size)
+        ])
+        FacilityReview.objects.bulk_create([
+            FacilityReview(user=booker, booking=booking, facility=booking.facility, rating=4)
+            for booking in bookings[::2]
+        ])
+        return booker
+
+    def run(self, size, label, queryset):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            FacilityBookingSerializer(queryset, many=True).data
+            elapsed = time.perf_counter() - started
+        self.stdout.write(f"{size:>10} {label:>8} {len(queries):>8} "
+                          f"{elapsed * 1000:>10.1f} {elapsed * 1e6 / size:>8.1f}")
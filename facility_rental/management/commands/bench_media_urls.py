@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand
+from storages.backends.s3boto3 import S3Boto3Storage
+from usAHA_backend.storage import CachedURLS3Storage
+
+# Presigning is local HMAC work, so dummy credentials exercise the real code path offline.
+BENCH_STORAGE_SETTINGS = {
+    'access_key': 'bench-access-key',
+    'secret_key': 'bench-secret-key',
+    'bucket_name': 'bench-bucket',
+    'region_name': 'ap-southeast-2',
+    'signature_version': 's3v4',
+    'querystring_auth': True,
+    'custom_domain': None,
+}
+
+class Command(BaseCommand):
+    help = "Time signed media URL generation for list pages, with and without the URL cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20, help="Rows per rendered page.")
+        parser.add_argument('--images', type=int, default=5, help="Images per row.")
+        parser.add_argument('--pages', type=int, default=200, help="Number of page renders to time.")
+        parser.add_argument('--distinct-pages', type=int, default=10,
+                            help="How many different pages the renders cycle through.")
+
+    def handle(self, *args, **options):
+        per_page = options['rows'] * options['images']
+        pages = [
+            [f"facility_images/bench-{page}-{index}.jpg" for index in range(per_page)]
+            for page in range(options['distinct_pages'])
+        ]
+
+        self.stdout.write(f"{'storage':>10} {'urls':>8} {'total ms':>10} {'us/url':>8} {'hit rate':>9}")
+        for label, storage in [('presign', S3Boto3Storage(**BENCH_STORAGE_SETTINGS)),
+                               ('cached', CachedURLS3Storage(**BENCH_STORAGE_SETTINGS))]:
+            storage.url(pages[0][0])  # Client setup is a one-off cost, keep it out of the timing.
+            started = time.perf_counter()
+            for render in range(options['pages']):
+                for name in pages[render % len(pages)]:
+                    storage.url(name)
+            elapsed = time.perf_counter() - started
+
+            urls = options['pages'] * per_page
+            hit_rate = f"{storage.url_cache.stats()['hit_rate']:.1%}" if label == 'cached' else '-'
+            self.stdout.write(f"{label:>10} {urls:>8} {elapsed * 1000:>10.1f} {elapsed * 1e6 / urls:>8.1f} {hit_rate:>9}")
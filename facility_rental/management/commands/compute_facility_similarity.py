@@ -0,0 +1,84 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from facility_rental.models import Facility, FacilitySimilarity
+
+# Relative weight of each signal in the final score; they sum to 1.
+WEIGHTS = {'amenities': 0.4, 'category': 0.25, 'city': 0.2, 'price': 0.15}
+
+class Command(BaseCommand):
+    help = ("Score every pair of facilities by amenity overlap (Jaccard), category, city and "
+            "price proximity, and store the top K neighbours of each facility.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows of the N x N score matrix held in memory at once.")
+
+    def handle(self, *args, **options):
+        rows = list(Facility.objects.order_by('pk').values_list('pk', 'category', 'city', 'price_per_day', 'amenity_names'))
+        if len(rows) < 2:
+            FacilitySimilarity.objects.all().delete()
+            self.stdout.write("Not enough facilities to compare")
+            return
+
+        pks = [row[0] for row in rows]
+        amenities = self.amenity_matrix([row[4] for row in rows])
+        amenity_counts = amenities.sum(axis=1)
+        categories = self.codes([row[1] for row in rows])
+        cities = self.codes([" ".join(row[2].split()).lower() for row in rows])
+        prices = np.array([row[3] for row in rows], dtype=np.float64)
+
+        top_k = min(options['top_k'], len(rows) - 1)
+        similarities = []
+        for start in range(0, len(rows), options['batch_size']):
+            batch = slice(start, start + options['batch_size'])
+            scores = self.score(amenities[batch], amenity_counts[batch], categories[batch], cities[batch], prices[batch],
+                                amenities, amenity_counts, categories, cities, prices)
+            # A facility is not its own neighbour.
+            np.fill_diagonal(scores[:, start:], -np.inf)
+
+            best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind='stable')
+            best, best_scores = np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+            for offset, (neighbours, neighbour_scores) in enumerate(zip(best, best_scores)):
+                similarities.extend(
+                    FacilitySimilarity(facility_id=pks[start + offset], similar_facility_id=pks[neighbour],
+                                       rank=rank, score=round(float(score), 6))
+                    for rank, (neighbour, score) in enumerate(zip(neighbours, neighbour_scores), start=1)
+                )
+
+        with transaction.atomic():
+            FacilitySimilarity.objects.all().delete()
+            FacilitySimilarity.objects.bulk_create(similarities, batch_size=5000)
+        self.stdout.write(f"Stored {len(similarities)} neighbours for {len(rows)} facilities")
+
+    def amenity_matrix(self, amenity_lists):
+        """Binary facility x amenity matrix over the vocabulary of normalized amenity names."""
+        vocabulary = {name: index for index, name in enumerate(sorted({name for names in amenity_lists for name in names}))}
+        matrix = np.zeros((len(amenity_lists), max(len(vocabulary), 1)), dtype=np.float32)
+        for row, names in enumerate(amenity_lists):
+            matrix[row, [vocabulary[name] for name in names]] = 1
+        return matrix
+
+    def codes(self, values):
+        return np.unique(np.array(values, dtype=object), return_inverse=True)[1]
+
+    def score(self, amenities, amenity_counts, categories, cities, prices,
+              all_amenities, all_amenity_counts, all_categories, all_cities, all_prices):
+        intersection = amenities @ all_amenities.T
+        union = amenity_counts[:, None] + all_amenity_counts[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        same_category = categories[:, None] == all_categories[None, :]
+        same_city = cities[:, None] == all_cities[None, :]
+
+        # 1 for equal prices, falling towards 0 as one becomes a small fraction of the other.
+        larger = np.maximum(prices[:, None], all_prices[None, :])
+        gap = np.abs(prices[:, None] - all_prices[None, :])
+        price = 1 - np.divide(gap, larger, out=np.zeros_like(gap), where=larger > 0)
+
+        return (WEIGHTS['amenities'] * jaccard + WEIGHTS['category'] * same_category
+                + WEIGHTS['city'] * same_city + WEIGHTS['price'] * price)
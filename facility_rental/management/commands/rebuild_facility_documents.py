@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from facility_rental.cache import bump_version, invalidate_detail
+from facility_rental.documents import refresh_documents
+from facility_rental.models import Facility
+
+class Command(BaseCommand):
+    help = "Re-render the stored public document of every facility (or only those given)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('facilities', nargs='*', help="Facility uuids; all facilities when omitted.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        facilities = Facility.objects.order_by('pk')
+        if options['facilities']:
+            facilities = facilities.filter(pk__in=options['facilities'])
+        pks = list(facilities.values_list('pk', flat=True))
+
+        rebuilt = 0
+        for start in range(0, len(pks), options['batch_size']):
+            batch = pks[start:start + options['batch_size']]
+            with transaction.atomic():
+                rebuilt += len(refresh_documents(batch, create=True))
+                invalidate_detail(*batch)
+        bump_version()
+        self.stdout.write(f"Rebuilt {rebuilt} facility documents")
@@ -0,0 +1,44 @@
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from facility_rental.cache import bump_version, invalidate_detail
+from facility_rental.documents import refresh_documents
+from facility_rental.models import Facility, FacilityReview, RATING_FIELDS
+
+class Command(BaseCommand):
+    help = "Rebuild the running rating totals and histograms of every facility from its reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        stats = FacilityReview.objects.values('facility').annotate(
+            total=Sum('rating'),
+            count=Count('pk'),
+            **{f"hist_{score}": Count('pk', filter=Q(rating=score)) for score in range(6)},
+        )
+        facilities = []
+        for row in stats.iterator():
+            facility = Facility(
+                pk=row['facility'],
+                # Half up, like the SQL ROUND in apply_rating_change.
+                rating=(Decimal(row['total']) / row['count']).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP),
+                rating_sum=row['total'],
+                rating_count=row['count'],
+            )
+            for score in range(6):
+                setattr(facility, f"rating_hist_{score}", row[f"hist_{score}"])
+            facilities.append(facility)
+
+        with transaction.atomic():
+            # Also moves updated_at, so conditional GETs see the new ratings.
+            Facility.objects.update(**{field: 0 for field in RATING_FIELDS}, updated_at=timezone.now())
+            Facility.objects.bulk_update(facilities, RATING_FIELDS, batch_size=options['batch_size'])
+            pks = list(Facility.objects.values_list('pk', flat=True))
+            for start in range(0, len(pks), options['batch_size']):
+                refresh_documents(pks[start:start + options['batch_size']])
+            bump_version()
+            invalidate_detail(*pks)
+        self.stdout.write(f"Recomputed ratings for {len(facilities)} reviewed facilities")
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from facility_rental.models import Facility_Booking
+
+class Command(BaseCommand):
+    help = "Delete unpaid booking holds whose TTL has passed, freeing their dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and sweep every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            _, deleted = Facility_Booking.objects.expired_holds().delete()
+            released = deleted.get(Facility_Booking._meta.label, 0)
+            if released:
+                self.stdout.write(f"Released {released} expired hold(s)")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
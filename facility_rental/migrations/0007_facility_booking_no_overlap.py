@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.operations
+import facility_rental.models
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0006_alter_facility_rating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Needed for the `facility WITH =` part of the gist exclusion constraint.
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='facility_booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('facility', '='), (facility_rental.models.DateRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary(inclusive_upper=True)), '&&')], name='facility_booking_no_overlap', violation_error_message='There is already a booking for the specified date range.'),
+        ),
+    ]
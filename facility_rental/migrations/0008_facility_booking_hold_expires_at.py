@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0007_facility_booking_no_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility_booking',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
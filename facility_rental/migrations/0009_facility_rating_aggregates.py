@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0008_facility_booking_hold_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_0',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_hist_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE facility_rental_facility AS f
+                SET rating = ROUND(s.total::numeric / s.count, 1),
+                    rating_sum = s.total,
+                    rating_count = s.count,
+                    rating_hist_0 = s.hist_0,
+                    rating_hist_1 = s.hist_1,
+                    rating_hist_2 = s.hist_2,
+                    rating_hist_3 = s.hist_3,
+                    rating_hist_4 = s.hist_4,
+                    rating_hist_5 = s.hist_5
+                FROM (
+                    SELECT facility_id,
+                           SUM(rating) AS total,
+                           COUNT(*) AS count,
+                           COUNT(*) FILTER (WHERE rating = 0) AS hist_0,
+                           COUNT(*) FILTER (WHERE rating = 1) AS hist_1,
+                           COUNT(*) FILTER (WHERE rating = 2) AS hist_2,
+                           COUNT(*) FILTER (WHERE rating = 3) AS hist_3,
+                           COUNT(*) FILTER (WHERE rating = 4) AS hist_4,
+                           COUNT(*) FILTER (WHERE rating = 5) AS hist_5
+                    FROM facility_rental_facilityreview
+                    GROUP BY facility_id
+                ) AS s
+                WHERE f.uuid = s.facility_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
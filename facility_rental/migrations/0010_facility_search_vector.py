@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0009_facility_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='facility',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='facility_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='facility_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE facility_rental_facility AS f
+                SET search_vector =
+                    setweight(to_tsvector('simple', f.name), 'A')
+                    || setweight(to_tsvector('simple', f.city), 'B')
+                    || setweight(to_tsvector('simple', COALESCE(
+                        (SELECT string_agg(a.name, ' ') FROM facility_rental_amenity AS a WHERE a.facility_id = f.uuid), ''
+                    )), 'B')
+                    || setweight(to_tsvector('simple', f.description), 'C');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
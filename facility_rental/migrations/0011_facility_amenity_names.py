@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0010_facility_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='amenity_names',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['amenity_names'], name='facility_amenity_names_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE facility_rental_facility AS f
+                SET amenity_names = COALESCE((
+                    SELECT array_agg(DISTINCT lower(regexp_replace(trim(a.name), '\\s+', ' ', 'g')))
+                    FROM facility_rental_amenity AS a
+                    WHERE a.facility_id = f.uuid
+                ), '{}');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0011_facility_amenity_names'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['-created_at', '-uuid'], name='facility_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['owner', '-created_at', '-uuid'], name='facility_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['category', 'price_per_day'], name='facility_category_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(django.db.models.functions.text.Upper('city'), models.F('price_per_day'), name='facility_city_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility_booking',
+            index=models.Index(fields=['facility', 'start_date'], name='booking_facility_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility_booking',
+            index=models.Index(fields=['booker', '-created_at', '-uuid'], name='booking_booker_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility_booking',
+            index=models.Index(fields=['-created_at', '-uuid'], name='booking_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility_booking',
+            index=models.Index(condition=models.Q(('hold_expires_at__isnull', False)), fields=['hold_expires_at'], name='booking_hold_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facilityreview',
+            index=models.Index(fields=['facility', '-created_at', '-id'], name='review_facility_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facilityreview',
+            index=models.Index(fields=['-created_at', '-id'], name='review_created_idx'),
+        ),
+    ]
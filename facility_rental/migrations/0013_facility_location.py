@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.conf import settings
+from django.db import migrations, models
+from usAHA_backend import geo
+
+
+def locate_facilities(apps, schema_editor):
+    Facility = apps.get_model('facility_rental', 'Facility')
+    located = []
+    for row in Facility.objects.only('location_link').iterator():
+        coordinates = geo.parse_coordinates(row.location_link)
+        if coordinates:
+            row.latitude, row.longitude = coordinates
+            row.geohash = geo.encode_geohash(*coordinates)
+            located.append(row)
+    Facility.objects.bulk_update(located, ['latitude', 'longitude', 'geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0012_secondary_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=9),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['geohash'], name='facility_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(locate_facilities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0013_facility_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilitySimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_facilities', to='facility_rental.facility')),
+                ('similar_facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='facility_rental.facility')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facility', 'rank'), name='facility_similarity_rank_unique')],
+            },
+        ),
+    ]
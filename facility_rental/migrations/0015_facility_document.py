@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:46
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+from rest_framework import serializers
+
+
+def build_documents(apps, schema_editor):
+    """
+    Store a document for every existing facility. The payload shape is frozen
+    here rather than taken from FacilityDocumentSerializer, which tracks the
+    current models.
+    """
+    Facility = apps.get_model('facility_rental', 'Facility')
+    FacilityDocument = apps.get_model('facility_rental', 'FacilityDocument')
+    Amenity = apps.get_model('facility_rental', 'Amenity')
+    FacilityImage = apps.get_model('facility_rental', 'Facility_Image')
+
+    class AmenitySerializer(serializers.ModelSerializer):
+        class Meta:
+            model = Amenity
+            fields = ['uuid', 'facility', 'name']
+
+    class ImageSerializer(serializers.ModelSerializer):
+        image = serializers.CharField(source='image.name', read_only=True)
+
+        class Meta:
+            model = FacilityImage
+            fields = ['uuid', 'facility', 'image', 'is_primary']
+
+    class DocumentSerializer(serializers.ModelSerializer):
+        owner_name = serializers.SerializerMethodField()
+        owner_pfp = serializers.SerializerMethodField()
+        owner_start = serializers.DateTimeField(source='owner.date_joined', read_only=True)
+        distance = serializers.SerializerMethodField()
+        amenities = AmenitySerializer(many=True, read_only=True)
+        images = ImageSerializer(many=True, read_only=True)
+
+        class Meta:
+            model = Facility
+            fields = ['uuid', 'owner', 'owner_name', 'owner_pfp',
+                      'owner_start', 'name', 'category', 'description',
+                      'city', 'location_link', 'latitude', 'longitude', 'distance',
+                      'price_per_day', 'rating', 'rating_count',
+                      'created_at', 'updated_at', 'amenities', 'images']
+
+        def get_owner_name(self, obj):
+            profile = getattr(obj.owner, 'profile', None)
+            return f"{profile.first_name} {profile.last_name}" if profile else None
+
+        def get_owner_pfp(self, obj):
+            profile = getattr(obj.owner, 'profile', None)
+            return profile.profile_pic.name or None if profile else None
+
+        def get_distance(self, obj):
+            return None
+
+    facilities = (Facility.objects.select_related('owner__profile')
+                  .prefetch_related('amenities', 'images').order_by('pk'))
+    batch = []
+    for facility in facilities.iterator(chunk_size=500):
+        batch.append(FacilityDocument(facility=facility, data=DocumentSerializer(facility).data))
+        if len(batch) == 500:
+            FacilityDocument.objects.bulk_create(batch)
+            batch = []
+    FacilityDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_rental', '0014_facility_similarity'),
+        ('user_profile', '0002_profile_profile_pic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilityDocument',
+            fields=[
+                ('facility', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='facility_rental.facility')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,101 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import ArrayField, DateRangeField, RangeBoundary, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField, TrigramSimilarity
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save, post_delete
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Avg
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Coalesce, Lower, NullIf, Round, RowNumber, Trim, Upper
+from django.utils import timezone
+from usAHA_backend import geo
+from user_profile.models import Profile
+from .cache import bump_version, invalidate_detail
 import uuid
 
+# Facility text is a mix of Indonesian and English, so no language-specific stemming.
+SEARCH_CONFIG = 'simple'
+
+def normalize_amenity(name):
+    return " ".join(name.split()).lower()
+
+# Price facet buckets in rupiah per day, as [min, max) with an open last bucket.
+PRICE_BUCKETS = [(0, 100000), (100000, 250000), (250000, 500000), (500000, 1000000), (1000000, None)]
+
+class FacilityQuerySet(models.QuerySet):
+    def for_document(self):
+        return self.select_related('owner__profile').prefetch_related('amenities', 'images')
+
+    def for_listing(self):
+        # Owner display fields come from the profile card cache, not a join.
+        return self.prefetch_related('amenities', 'images')
+
+    def with_amenities(self, names):
+        """Facilities offering every one of the given amenities, via the GIN index on amenity_names."""
+        return self.filter(amenity_names__contains=sorted({normalize_amenity(name) for name in names}))
+
+    def search(self, text):
+        """Full-text matches plus trigram matches on the name (for typos), best first."""
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        rank = SearchRank(F('search_vector'), query) + TrigramSimilarity('name', text)
+        return (self.filter(models.Q(search_vector=query) | models.Q(name__trigram_similar=text))
+                .annotate(rank=Cast(rank, models.FloatField()))
+                .order_by('-rank', '-rating'))
+
+    def near(self, latitude, longitude, radius_km):
+        return geo.near(self, latitude, longitude, radius_km)
+
+    def nearest(self, latitude, longitude, count):
+        return geo.nearest(self, latitude, longitude, count)
+
+    def top_per_category(self, count):
+        """The `count` best-rated facilities of each category, ranked with ROW_NUMBER() in one query."""
+        position = models.Window(
+            RowNumber(),
+            partition_by=F('category'),
+            order_by=[F('rating').desc(), F('rating_count').desc(), F('created_at').desc()],
+        )
+        return (self.annotate(position=position)
+                .filter(position__lte=count)
+                .order_by('category', 'position'))
+
+    def facet_counts(self):
+        """Row counts per (category, city, price bucket) combination in one grouped query."""
+        bucket = models.Case(
+            *[models.When(price_per_day__gte=low, then=Value(index)) if high is None else
+              models.When(price_per_day__gte=low, price_per_day__lt=high, then=Value(index))
+              for index, (low, high) in enumerate(PRICE_BUCKETS)],
+            output_field=models.IntegerField(),
+        )
+        return (self.order_by()
+                .values('category', city_key=Lower(Trim('city')), bucket=bucket)
+                .annotate(city_label=models.Min('city'), count=models.Count('pk')))
+
+    def available_between(self, start_date, end_date):
+        # A single anti-join; each probe hits the booking exclusion constraint's gist index.
+        bookings = Facility_Booking.objects.blocking().filter(facility=models.OuterRef('pk')).overlapping(start_date, end_date)
+        return self.filter(~models.Exists(bookings))
+
+    def with_bookings_in(self, ranges):
+        """Annotate booked_0..booked_n: whether each (start_date, end_date) range overlaps a booking."""
+        return self.annotate(**{
+            f"booked_{index}": models.Exists(
+                Facility_Booking.objects.blocking().filter(facility=models.OuterRef('pk')).overlapping(start_date, end_date)
+            )
+            for index, (start_date, end_date) in enumerate(ranges)
+        })
+
+RATING_SCORES = range(6)
+RATING_RANGE_MESSAGE = "Rating must be between 0 and 5."
+RATING_HISTOGRAM_FIELDS = [f"rating_hist_{score}" for score in RATING_SCORES]
+RATING_FIELDS = ['rating', 'rating_sum', 'rating_count', *RATING_HISTOGRAM_FIELDS]
+# Columns maintained by signals with queryset updates rather than by Facility.save().
+DERIVED_FIELDS = [*RATING_FIELDS, 'amenity_names', 'search_vector']
+
 class Facility(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="facilities")
@@ -21,6 +110,9 @@ class Facility(models.Model):
     description = models.TextField(max_length=500, default="")
     city = models.CharField(max_length=50)
     location_link = models.TextField(max_length=500)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=geo.GEOHASH_PRECISION, blank=True, default='', editable=False)
     price_per_day = models.IntegerField(
         default=0,
         validators=[MinValueValidator(0, message="The price cannot be negative."),]
@@ -32,11 +124,47 @@ class Facility(models.Model):
         validators=[MinValueValidator(0, message="Rating cannot be negative."), 
                     MaxValueValidator(5, message="Rating cannot be more than five")]
     )
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_0 = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_hist_5 = models.PositiveIntegerField(default=0, editable=False)
+    amenity_names = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FacilityQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['amenity_names'], name='facility_amenity_names_idx'),
+            GinIndex(fields=['search_vector'], name='facility_search_vector_idx'),
+            GinIndex(fields=['name'], name='facility_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            # Default list ordering, with the pk tiebreaker used by keyset pagination.
+            models.Index(fields=['-created_at', '-uuid'], name='facility_created_idx'),
+            models.Index(fields=['owner', '-created_at', '-uuid'], name='facility_owner_created_idx'),
+            models.Index(fields=['category', 'price_per_day'], name='facility_category_price_idx'),
+            # The city filter is case-insensitive, which compares UPPER(city).
+            models.Index(Upper('city'), 'price_per_day', name='facility_city_price_idx'),
+            # Prefix scans over geohash cells for proximity search.
+            models.Index(fields=['geohash'], name='facility_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        geo.locate(self)
+        # Derived columns are only changed through queryset updates from
+        # signals, so a regular save must not write back a stale copy.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in DERIVED_FIELDS]
+        super().save(*args, **kwargs)
     
     def delete(self, *args, **kwargs):
         self.images.all().delete()
@@ -57,6 +185,55 @@ class Amenity(models.Model):
     class Meta:
         unique_together = (('facility_id', 'name'),)
 
+class FacilitySimilarity(models.Model):
+    """Precomputed nearest neighbours of a facility, written by the compute_facility_similarity command."""
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="similar_facilities")
+    similar_facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="similar_to")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facility', 'rank'], name='facility_similarity_rank_unique'),
+        ]
+
+class FacilityDocument(models.Model):
+    """
+    The public representation of a facility, rendered once on write so reads
+    need no joins. Media fields hold storage keys, signed when served.
+    """
+    facility = models.OneToOneField(Facility, on_delete=models.CASCADE, primary_key=True, related_name="document")
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+class DateRange(models.Func):
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+BOOKING_OVERLAP_CONSTRAINT = 'facility_booking_no_overlap'
+BOOKING_OVERLAP_MESSAGE = "There is already a booking for the specified date range."
+
+class FacilityBookingQuerySet(models.QuerySet):
+    def blocking(self):
+        """Bookings that keep their dates: confirmed ones and holds that have not expired yet."""
+        return self.filter(models.Q(hold_expires_at__isnull=True) | models.Q(hold_expires_at__gt=timezone.now()))
+
+    def expired_holds(self):
+        return self.filter(hold_expires_at__lte=timezone.now())
+
+    def overlapping(self, start_date, end_date):
+        # Uses the same expression as the exclusion constraint so its index applies.
+        period = DateRange('start_date', 'end_date', RangeBoundary(inclusive_upper=True))
+        requested = DateRange(models.Value(start_date), models.Value(end_date), RangeBoundary(inclusive_upper=True))
+        return self.alias(period=period).filter(period__overlap=requested)
+
+    def for_feed(self):
+        primary_images = models.Prefetch(
+            'facility__images',
+            queryset=Facility_Image.objects.filter(is_primary=True),
+            to_attr='primary_images',
+        )
+        return self.select_related('facility', 'review').prefetch_related(primary_images)
+
 class Facility_Booking(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="bookings")
@@ -66,30 +243,56 @@ class Facility_Booking(models.Model):
     notes = models.TextField(blank=True, null=True)
     is_approved = models.BooleanField(default=False)
     is_paid = models.BooleanField(default=False)
+    hold_expires_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = FacilityBookingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            ExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ('facility', RangeOperators.EQUAL),
+                    (DateRange('start_date', 'end_date', RangeBoundary(inclusive_upper=True)), RangeOperators.OVERLAPS),
+                ],
+                violation_error_message=BOOKING_OVERLAP_MESSAGE,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['facility', 'start_date'], name='booking_facility_start_idx'),
+            models.Index(fields=['booker', '-created_at', '-uuid'], name='booking_booker_created_idx'),
+            models.Index(fields=['-created_at', '-uuid'], name='booking_created_idx'),
+            # Only holds have an expiry, so the sweeper's index stays small.
+            models.Index(fields=['hold_expires_at'], name='booking_hold_expires_idx',
+                         condition=models.Q(hold_expires_at__isnull=False)),
+        ]
+
     @property
     def duration(self):
         return (self.end_date - self.start_date).days + 1
 
+    @property
+    def is_hold_expired(self):
+        return self.hold_expires_at is not None and self.hold_expires_at <= timezone.now()
+
     def clean(self):
+        # Overlaps are rejected by the exclusion constraint when the row is written.
         if self.start_date and self.end_date:
             if self.end_date < self.start_date:
                 raise ValidationError("End date cannot be before start date.")
-            overlapping_bookings = Facility_Booking.objects.filter(
-                facility=self.facility,
-                end_date__gte=self.start_date,
-                start_date__lte=self.end_date
-            ).exclude(uuid=self.uuid)
-            if overlapping_bookings.exists():
-                raise ValidationError("There is already a booking for the specified date range.")
 
     def save(self, *args, **kwargs):
         if self.start_date and self.end_date:
             if self.end_date < self.start_date:
                 raise ValidationError("End date cannot be before start date.")
-        super(Facility_Booking, self).save(*args, **kwargs)
-        self.full_clean()
+        try:
+            with transaction.atomic():
+                super(Facility_Booking, self).save(*args, **kwargs)
+        except IntegrityError as e:
+            if BOOKING_OVERLAP_CONSTRAINT in str(e):
+                raise ValidationError(BOOKING_OVERLAP_MESSAGE)
+            raise
 
     def __str__(self):
         return f"Booking by {self.booker} for facility {self.facility} from {self.start_date} to {self.end_date}"
@@ -107,18 +310,147 @@ class FacilityReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['facility', '-created_at', '-id'], name='review_facility_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='review_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Checked before writing: the rating signals index a histogram column by it.
+        if self.rating not in RATING_SCORES:
+            raise ValidationError({"rating": RATING_RANGE_MESSAGE})
+        super().save(*args, **kwargs)
+
+def apply_rating_change(facility_id, added=None, removed=None):
+    """Move a facility's running rating totals by one review in a single UPDATE."""
+    if any(score is not None and score not in RATING_SCORES for score in (added, removed)):
+        raise ValidationError({"rating": RATING_RANGE_MESSAGE})
+    sum_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    changes = {
+        'rating_sum': F('rating_sum') + sum_delta,
+        'rating_count': F('rating_count') + count_delta,
+        # SET expressions see the pre-update row, so apply the deltas here as well.
+        'rating': Coalesce(
+            Round(Cast(F('rating_sum') + sum_delta, models.DecimalField(max_digits=12, decimal_places=2))
+                  / NullIf(F('rating_count') + count_delta, 0), 1),
+            Value(0),
+            output_field=models.DecimalField(max_digits=2, decimal_places=1),
+        ),
+        'updated_at': timezone.now(),
+    }
+    if added != removed:
+        if added is not None:
+            changes[f"rating_hist_{added}"] = F(f"rating_hist_{added}") + 1
+        if removed is not None:
+            changes[f"rating_hist_{removed}"] = F(f"rating_hist_{removed}") - 1
+    Facility.objects.filter(pk=facility_id).update(**changes)
+    refresh_facility_documents([facility_id])
+    bump_version()
+    invalidate_detail(facility_id)
+
+@receiver(post_init, sender=FacilityReview)
+def remember_review_rating(sender, instance, **kwargs):
+    # The rating as last stored, so an edit can move it between histogram buckets.
+    instance._stored_rating = instance.__dict__.get('rating')
+
 @receiver(post_save, sender=FacilityReview)
-def update_facility_rating(sender, instance, **kwargs):
-    facility = instance.facility
-    reviews = FacilityReview.objects.filter(facility=facility)
-    average_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-    facility.rating = round(average_rating, 2) if average_rating is not None else 0
-    facility.save()
+def update_facility_rating(sender, instance, created, **kwargs):
+    if created:
+        apply_rating_change(instance.facility_id, added=instance.rating)
+    elif instance.rating != instance._stored_rating:
+        apply_rating_change(instance.facility_id, added=instance.rating, removed=instance._stored_rating)
+    instance._stored_rating = instance.rating
 
 @receiver(post_delete, sender=FacilityReview)
 def update_facility_rating_on_delete(sender, instance, **kwargs):
-    facility = instance.facility
-    reviews = FacilityReview.objects.filter(facility=facility)
-    average_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-    facility.rating = round(average_rating, 2) if average_rating is not None else 0
-    facility.save()
\ No newline at end of file
+    apply_rating_change(instance.facility_id, removed=instance._stored_rating)
+
+def refresh_facility_documents(facility_ids, create=False):
+    # Imported here because the document serializer imports this module.
+    from .documents import refresh_documents
+    refresh_documents(facility_ids, create=create)
+
+def build_search_vector(amenity_text):
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('city', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(amenity_text, weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+def sync_amenity_names(facility_id):
+    """Copy a facility's amenities into amenity_names (and its search vector) after amenity writes."""
+    names = sorted({normalize_amenity(name) for name in
+                    Amenity.objects.filter(facility_id=facility_id).values_list('name', flat=True)})
+    Facility.objects.filter(pk=facility_id).update(
+        amenity_names=names,
+        search_vector=build_search_vector(Value(" ".join(names))),
+        updated_at=timezone.now(),
+    )
+    refresh_facility_documents([facility_id])
+    bump_version()
+
+@receiver(post_init, sender=Facility)
+def remember_facility_location(sender, instance, **kwargs):
+    geo.remember_location(instance)
+
+@receiver(post_save, sender=Facility)
+def update_facility_search_vector(sender, instance, **kwargs):
+    amenity_text = models.Func(F('amenity_names'), Value(' '), function='ARRAY_TO_STRING', output_field=models.TextField())
+    Facility.objects.filter(pk=instance.pk).update(search_vector=build_search_vector(amenity_text))
+
+@receiver(post_save, sender=Facility)
+def update_facility_document(sender, instance, **kwargs):
+    refresh_facility_documents([instance.pk], create=True)
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def update_facility_amenity_names(sender, instance, **kwargs):
+    sync_amenity_names(instance.facility_id)
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def invalidate_facility_cache(sender, instance, **kwargs):
+    bump_version()
+    invalidate_detail(instance.pk)
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_facility_detail(sender, instance, **kwargs):
+    invalidate_detail(instance.facility_id)
+
+@receiver(post_save, sender=Facility_Image)
+@receiver(post_delete, sender=Facility_Image)
+def touch_facility_on_image_change(sender, instance, **kwargs):
+    Facility.objects.filter(pk=instance.facility_id).update(updated_at=timezone.now())
+    refresh_facility_documents([instance.facility_id])
+    bump_version()
+    invalidate_detail(instance.facility_id)
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def touch_user_content_on_profile_change(sender, instance, **kwargs):
+    touch_user_content(instance.user_id)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_user_content_on_user_change(sender, instance, update_fields=None, **kwargs):
+    # Of the user row, payloads only show date_joined; skip saves that cannot change it (e.g. last_login).
+    if update_fields is not None and 'date_joined' not in update_fields:
+        return
+    touch_user_content(instance.pk)
+
+def touch_user_content(user_id):
+    # Facility and review payloads embed the user's name, picture and join date.
+    FacilityReview.objects.filter(user_id=user_id).update(updated_at=timezone.now())
+    touch_facilities(Facility.objects.filter(owner_id=user_id))
+
+def touch_facilities(facilities):
+    facility_ids = list(facilities.values_list('pk', flat=True))
+    if not facility_ids:
+        return
+    Facility.objects.filter(pk__in=facility_ids).update(updated_at=timezone.now())
+    refresh_facility_documents(facility_ids)
+    bump_version()
+    invalidate_detail(*facility_ids)
@@ -1,6 +1,12 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 from rest_framework import serializers
 from .models import *
-from user_profile.models import Profile
+from user_profile.serializers import ProfileCardListSerializer, ProfileCardMixin
+
+COORDINATE_KWARGS = {"latitude": {"min_value": -90, "max_value": 90},
+                     "longitude": {"min_value": -180, "max_value": 180}}
 
 class AmenitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,7 +20,8 @@ class FacilityImageSerializer(serializers.ModelSerializer):
         fields = ["uuid", "facility", "image", "is_primary"]
         extra_kwargs = {"uuid": {"read_only": True}}
 
-class CreateFacilitySerializer(serializers.ModelSerializer):
+class CreateFacilitySerializer(ProfileCardMixin, serializers.ModelSerializer):
+    card_user_field = 'owner_id'
     owner_name = serializers.SerializerMethodField()
     owner_pfp = serializers.SerializerMethodField()
     owner_start = serializers.SerializerMethodField()
@@ -25,75 +32,94 @@ class CreateFacilitySerializer(serializers.ModelSerializer):
         model = Facility
         fields = ['uuid', 'owner', 'owner_name', 'owner_pfp', 
                   'owner_start', 'name', 'category', 'description', 
-                  'city', 'location_link', 'price_per_day', 'rating',
+                  'city', 'location_link', 'latitude', 'longitude', 'price_per_day', 'rating',
                   'created_at', 'updated_at', 'amenities', 'images']
         extra_kwargs = {"owner": {"read_only": True}, "rating": {"read_only": True},
-                        "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
+                        "created_at": {"read_only": True}, "updated_at": {"read_only": True},
+                        **COORDINATE_KWARGS}
+        list_serializer_class = ProfileCardListSerializer
 
     def get_owner_name(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.owner)
-            owner_name = f"{profile.first_name} {profile.last_name}"
-            return owner_name if owner_name else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["name"]
         
     def get_owner_start(self, obj):
-        return obj.owner.date_joined
+        return self.get_card(obj)["joined"]
     
     def get_owner_pfp(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.owner)
-            return profile.profile_pic.url if profile.profile_pic else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["pfp_url"]
 
     def get_amenities(self, obj):
         return [amenity.name for amenity in obj.amenities.all()]
 
-class FacilitySerializer(serializers.ModelSerializer):
+class FacilitySerializer(ProfileCardMixin, serializers.ModelSerializer):
+    card_user_field = 'owner_id'
     owner_name = serializers.SerializerMethodField()
     owner_pfp = serializers.SerializerMethodField()
     owner_start = serializers.SerializerMethodField()
     amenities = AmenitySerializer(many=True, read_only=True)
     images = FacilityImageSerializer(many=True, read_only=True)
+    distance = serializers.SerializerMethodField()
 
     class Meta:
         model = Facility
         fields = ['uuid', 'owner', 'owner_name', 'owner_pfp', 
                   'owner_start', 'name', 'category', 'description', 
-                  'city', 'location_link', 'price_per_day', 'rating',
+                  'city', 'location_link', 'latitude', 'longitude', 'distance',
+                  'price_per_day', 'rating', 'rating_count',
                   'created_at', 'updated_at', 'amenities', 'images']
         extra_kwargs = {"owner": {"read_only": True}, "rating": {"read_only": True},
-                        "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
+                        "created_at": {"read_only": True}, "updated_at": {"read_only": True},
+                        **COORDINATE_KWARGS}
+        list_serializer_class = ProfileCardListSerializer
+
+    def get_distance(self, obj):
+        # Only set on proximity queries, in km.
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 2) if distance is not None else None
 
     def get_owner_name(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.owner)
-            owner_name = f"{profile.first_name} {profile.last_name}"
-            return owner_name if owner_name else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["name"]
         
     def get_owner_start(self, obj):
-        return obj.owner.date_joined
+        return self.get_card(obj)["joined"]
     
     def get_owner_pfp(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.owner)
-            return profile.profile_pic.url if profile.profile_pic else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["pfp_url"]
+
 
+class FacilityImageDocumentSerializer(FacilityImageSerializer):
+    image = serializers.CharField(source='image.name', read_only=True)
+
+class FacilityDocumentSerializer(FacilitySerializer):
+    """
+    FacilitySerializer output as stored in FacilityDocument: owner fields come
+    from `for_document()` and media fields hold storage keys instead of URLs.
+    """
+    images = FacilityImageDocumentSerializer(many=True, read_only=True)
+
+    class Meta(FacilitySerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+    def get_owner_name(self, obj):
+        profile = getattr(obj.owner, 'profile', None)
+        return f"{profile.first_name} {profile.last_name}" if profile else None
+
+    def get_owner_start(self, obj):
+        return serializers.DateTimeField().to_representation(obj.owner.date_joined)
+
+    def get_owner_pfp(self, obj):
+        profile = getattr(obj.owner, 'profile', None)
+        return profile.profile_pic.name or None if profile else None
     
 class FacilityUpdateSerializer(serializers.ModelSerializer):
     owner_username = serializers.SerializerMethodField()
     class Meta:
         model = Facility
         fields = ['uuid', 'owner', 'owner_username', 'name', 'category', 'description', 
-                  'city', 'location_link', 'price_per_day', 'created_at', 'updated_at']
+                  'city', 'location_link', 'latitude', 'longitude', 'price_per_day', 'created_at', 'updated_at']
         extra_kwargs = {"uuid": {"read_only": True}, "owner": {"read_only": True}, 
-                        "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
+                        "created_at": {"read_only": True}, "updated_at": {"read_only": True},
+                        **COORDINATE_KWARGS}
 
     def get_owner_username(self, obj):
         return obj.owner.username
@@ -108,10 +134,11 @@ class FacilityBookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Facility_Booking
         fields = ["uuid", "facility", "booker", "start_date", "end_date", 
-                  "duration", "notes", "is_approved", "is_paid", "user_rating", 
+                  "duration", "notes", "is_approved", "is_paid", "hold_expires_at", "user_rating", 
                   "facility_name", "city", "price_per_day", "image"]
         extra_kwargs = {"uuid": {"read_only": True}, "booker": {"read_only": True}, 
                         "is_paid": {"read_only": True}, "is_approved": {"read_only": True},
+                        "hold_expires_at": {"read_only": True},
                         "duration": {"read_only": True}, "user_rating": {"read_only": True},
                         "facility_name": {"read_only": True}, "city": {"read_only": True},
                         "price_per_day": {"read_only": True}, "image": {"read_only": True},}
@@ -132,7 +159,11 @@ class FacilityBookingSerializer(serializers.ModelSerializer):
         return obj.facility.price_per_day
     
     def get_image(self, obj):
-        primary_image = obj.facility.images.filter(is_primary=True).first()
+        primary_images = getattr(obj.facility, 'primary_images', None)
+        if primary_images is None:
+            primary_image = obj.facility.images.filter(is_primary=True).first()
+        else:
+            primary_image = primary_images[0] if primary_images else None
         return FacilityImageSerializer(primary_image).data if primary_image else None
 
     def validate(self, data):
@@ -152,20 +183,29 @@ class FacilityBookingSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         booker = self.context.get('booker')
-        booking = Facility_Booking.objects.create(booker=booker, **validated_data)
+        # Expired holds still occupy the exclusion constraint until the sweeper
+        # runs, so release the ones in the way before placing a new hold.
+        Facility_Booking.objects.expired_holds().filter(facility=validated_data['facility']).overlapping(
+            validated_data['start_date'], validated_data['end_date']
+        ).delete()
+        hold_expires_at = timezone.now() + settings.BOOKING_HOLD_TTL
+        try:
+            booking = Facility_Booking.objects.create(booker=booker, hold_expires_at=hold_expires_at, **validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
         return booking
     
 class FacilityBookingUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Facility_Booking
         fields = ["uuid", "facility", "booker", "start_date", "end_date", 
-                  "duration", "notes", "is_approved", "is_paid"]
+                  "duration", "notes", "is_approved", "is_paid", "hold_expires_at"]
         extra_kwargs = {"uuid": {"read_only": True}, "facility": {"read_only": True}, 
                         "booker": {"read_only": True}, "start_date": {"read_only": True}, 
                         "end_date": {"read_only": True}, "duration": {"read_only": True}, 
-                        "is_paid": {"read_only": True}}
+                        "is_paid": {"read_only": True}, "hold_expires_at": {"read_only": True}}
         
-class FacilityReviewSerializer(serializers.ModelSerializer):
+class FacilityReviewSerializer(ProfileCardMixin, serializers.ModelSerializer):
     user_name = serializers.SerializerMethodField()
     user_pfp = serializers.SerializerMethodField()
     user_start = serializers.SerializerMethodField()
@@ -178,6 +218,7 @@ class FacilityReviewSerializer(serializers.ModelSerializer):
                   "content", "created_at", "updated_at"]
         extra_kwargs = {"id": {"read_only": True}, "user": {"read_only": True}, 
                         "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
+        list_serializer_class = ProfileCardListSerializer
         
     def create(self, validated_data):
         user = self.context.get('user')
@@ -185,22 +226,13 @@ class FacilityReviewSerializer(serializers.ModelSerializer):
         return review
     
     def get_user_name(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.user)
-            user_name = f"{profile.first_name} {profile.last_name}"
-            return user_name if user_name else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["name"]
         
     def get_user_start(self, obj):
-        return obj.user.date_joined
+        return self.get_card(obj)["joined"]
     
     def get_user_pfp(self, obj):
-        try:
-            profile = Profile.objects.get(user=obj.user)
-            return profile.profile_pic.url if profile.profile_pic else None
-        except Profile.DoesNotExist:
-            return None
+        return self.get_card(obj)["pfp_url"]
     
     def get_facility_name(self, obj):
         return obj.facility.name
@@ -212,4 +244,17 @@ class FacilityReviewUpdateSerializer(serializers.ModelSerializer):
                   "content", "created_at", "updated_at"]
         extra_kwargs = {"id": {"read_only": True}, "user": {"read_only": True}, 
                         "booking": {"read_only": True}, "facility": {"read_only": True}, 
-                        "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
\ No newline at end of file
+                        "created_at": {"read_only": True}, "updated_at": {"read_only": True}}
+
+class DateRangeSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date cannot be before start date.")
+        return data
+
+class FacilityAvailabilitySerializer(serializers.Serializer):
+    facilities = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=200)
+    ranges = DateRangeSerializer(many=True, allow_empty=False, max_length=12)
@@ -1,3 +1,262 @@
-from django.test import TestCase
+import datetime
+import itertools
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal, ROUND_HALF_UP
+from urllib.parse import unquote
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.db import connection
+from django.db.models import Avg, Count, Sum
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from user_profile.models import Profile
+from usAHA_backend.query_budget import QueryBudgetExceeded
+from .cache import check_shared_cache
+from .models import *
+from .views import FacilitiesListAPIView
 
-# Create your tests here.
+_counter = itertools.count()
+
+def make_user():
+    number = next(_counter)
+    user = CustomUser.objects.create(username=f"user{number}", email=f"user{number}@example.com")
+    Profile.objects.create(user=user, first_name="First", last_name=f"Last{number}",
+                           contact_number=f"08{number:08d}", profile_pic="profile_pics/pfp.jpg")
+    return user
+
+def make_facility(owner=None, **kwargs):
+    facility = Facility.objects.create(owner=owner or make_user(), name=kwargs.pop('name', "Facility"),
+                                       city="Depok", location_link="", price_per_day=100, **kwargs)
+    for name in ("Wifi", "Parking"):
+        Amenity.objects.create(facility=facility, name=name)
+    for index in range(2):
+        Facility_Image.objects.create(facility=facility, image=f"facility_images/{index}.jpg", is_primary=index == 0)
+    return facility
+
+def encode_cursor(payload):
+    return urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+def make_booking(facility, booker, day, nights=1, **kwargs):
+    start = datetime.date(2030, 1, 1) + datetime.timedelta(days=day)
+    return Facility_Booking.objects.create(facility=facility, booker=booker, start_date=start,
+                                           end_date=start + datetime.timedelta(days=nights - 1), **kwargs)
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/facilities/')
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_over_budget_raises_in_strict_mode(self):
+        view = FacilitiesListAPIView.as_view(query_budget=0)
+        with self.assertRaisesMessage(QueryBudgetExceeded, "budget is 0"):
+            view(self.request)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logs_otherwise(self):
+        view = FacilitiesListAPIView.as_view(query_budget=0)
+        with self.assertLogs('usAHA_backend.query_budget', level='WARNING'):
+            response = view(self.request)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_within_budget(self):
+        response = FacilitiesListAPIView.as_view()(self.request)
+        self.assertEqual(response.status_code, 200)
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ListingQueryCountTests(TestCase):
+    """Listing endpoints run the same number of queries for one row as for a full page."""
+    rows = 8
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_user()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def assertConstantQueries(self, url, add_row):
+        add_row()
+        expected, response = self.count_queries(url)
+        self.assertEqual(len(response.json()['results']), 1)
+        for _ in range(self.rows - 1):
+            add_row()
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), self.rows)
+
+    def test_facility_list(self):
+        self.assertConstantQueries('/facilities/', make_facility)
+
+    def test_owner_facilities(self):
+        self.assertConstantQueries('/facilities/owner/', lambda: make_facility(owner=self.user))
+
+    def test_booking_feed(self):
+        facility = make_facility()
+        days = itertools.count()
+        self.assertConstantQueries('/facilities/bookings/', lambda: make_booking(facility, make_user(), next(days)))
+
+    def test_user_booking_feed(self):
+        days = itertools.count()
+        def add_booking():
+            booking = make_booking(make_facility(), self.user, next(days))
+            FacilityReview.objects.create(user=self.user, booking=booking, facility=booking.facility, rating=4)
+        self.assertConstantQueries('/facilities/bookings/user/', add_booking)
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        owner = make_user()
+        # Equal names tie on search rank; ratings tie in pairs.
+        for index in range(7):
+            facility = Facility.objects.create(owner=owner, name="Studio", city="Depok", location_link="")
+            Facility.objects.filter(pk=facility.pk).update(rating=index // 2)
+
+    def walk(self, url):
+        """Every page forwards from url, then every page back from the last one."""
+        forward, next_url = [], url
+        while next_url:
+            data = self.client.get(next_url).json()
+            forward.append([row['uuid'] for row in data['results']])
+            next_url, previous_url = data['next'], data['previous']
+        backward = [forward[-1]]
+        while previous_url:
+            data = self.client.get(previous_url).json()
+            backward.insert(0, [row['uuid'] for row in data['results']])
+            previous_url = data['previous']
+        return forward, backward
+
+    def test_round_trip_with_ties(self):
+        forward, backward = self.walk('/facilities/?page_size=3')
+        rows = [row for page in forward for row in page]
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(len(set(rows)), 7)
+        self.assertEqual(forward, backward)
+
+    def test_search_rank_ordering(self):
+        forward, backward = self.walk('/facilities/?q=studio&page_size=2')
+        rows = [row for page in forward for row in page]
+        self.assertEqual(len(set(rows)), 7)
+        self.assertEqual(forward, backward)
+        # Equal ranks fall back to -rating.
+        ratings = dict(Facility.objects.values_list('uuid', 'rating'))
+        self.assertEqual([ratings[uuid.UUID(row)] for row in rows],
+                         sorted(ratings.values(), reverse=True))
+
+    def test_bad_cursors(self):
+        first_page = self.client.get('/facilities/?page_size=2').json()
+        cursor = first_page['next'].split('cursor=')[1].split('&')[0]
+        payload = json.loads(urlsafe_b64decode(unquote(cursor)))
+        tampered = [
+            "garbage",
+            urlsafe_b64encode(b"not json").decode(),
+            encode_cursor({**payload, 'o': ['-name']}),
+            encode_cursor({**payload, 'p': ["not-a-date", payload['p'][1]]}),
+            encode_cursor({**payload, 'p': [[1], {}]}),
+            encode_cursor({'p': payload['p']}),
+        ]
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f'/facilities/?page_size=2&cursor={cursor}').status_code, 404)
+
+class BookingOverlapTests(TestCase):
+    def setUp(self):
+        self.facility = make_facility()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+        self.existing = make_booking(self.facility, make_user(), 0, nights=2)
+
+    def book(self, start_date, end_date):
+        return self.client.post('/facilities/booking/create/', {
+            "facility": str(self.facility.pk), "start_date": start_date, "end_date": end_date,
+        }, format='json')
+
+    def test_overlapping_booking_is_rejected(self):
+        response = self.book("2030-01-02", "2030-01-04")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(BOOKING_OVERLAP_MESSAGE, str(response.json()))
+        self.assertEqual(Facility_Booking.objects.filter(facility=self.facility).count(), 1)
+
+    def test_adjacent_booking_is_accepted(self):
+        response = self.book("2030-01-03", "2030-01-04")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Facility_Booking.objects.filter(facility=self.facility).count(), 2)
+
+    def test_expired_hold_is_replaced(self):
+        Facility_Booking.objects.filter(pk=self.existing.pk).update(
+            hold_expires_at=timezone.now() - datetime.timedelta(minutes=1))
+        response = self.book("2030-01-02", "2030-01-04")
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Facility_Booking.objects.filter(pk=self.existing.pk).exists())
+        self.assertEqual(response.json()['start_date'], "2030-01-02")
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.facility = make_facility()
+        self.days = itertools.count()
+
+    def review(self, rating):
+        user = make_user()
+        booking = make_booking(self.facility, user, next(self.days))
+        return FacilityReview.objects.create(user=user, booking=booking, facility=self.facility, rating=rating)
+
+    def assertAggregatesMatchReviews(self):
+        facility = Facility.objects.get(pk=self.facility.pk)
+        reviews = FacilityReview.objects.filter(facility=self.facility)
+        fresh = reviews.aggregate(total=Sum('rating'), count=Count('pk'), average=Avg('rating'))
+        self.assertEqual(facility.rating_count, fresh['count'])
+        self.assertEqual(facility.rating_sum, fresh['total'] or 0)
+        expected = Decimal(fresh['average']).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP) if fresh['count'] else 0
+        self.assertEqual(facility.rating, expected)
+        for score in RATING_SCORES:
+            self.assertEqual(getattr(facility, f"rating_hist_{score}"), reviews.filter(rating=score).count())
+
+    def test_create_edit_delete(self):
+        self.review(4)
+        review = self.review(3)
+        self.assertAggregatesMatchReviews()
+
+        review.rating = 5
+        review.save()
+        self.assertAggregatesMatchReviews()
+
+        review.delete()
+        self.assertAggregatesMatchReviews()
+
+    def test_half_rounds_up(self):
+        for rating in (1, 1, 1, 2):
+            self.review(rating)
+        self.assertEqual(Facility.objects.get(pk=self.facility.pk).rating, Decimal('1.3'))
+        self.assertAggregatesMatchReviews()
+
+    def test_out_of_range_rating_is_rejected(self):
+        review = self.review(3)
+        review.rating = 6
+        with self.assertRaises(ValidationError):
+            review.save()
+        with self.assertRaises(ValidationError):
+            self.review(-1)
+        self.assertAggregatesMatchReviews()
+
+class SharedCacheCheckTests(TestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_fails_deploy_check(self):
+        errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ['facility_rental.E001'])
+        self.assertIn('facility_rental.E001', [error.id for error in run_checks(include_deployment_checks=True)])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                           'LOCATION': 'redis://localhost:6379'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+        self.assertNotIn('facility_rental.E001', [error.id for error in run_checks()])
@@ -3,9 +3,16 @@ from .views import *
 
 urlpatterns = [
     path('', FacilitiesListAPIView.as_view(), name='all-facilities'),
+    path('top/', TopFacilitiesAPIView.as_view(), name='top-facilities'),
+    path('facets/', FacilityFacetsAPIView.as_view(), name='facility-facets'),
+    path('nearest/', FacilityNearestAPIView.as_view(), name='nearest-facilities'),
     path('owner/', OwnerFacilitiesAPIView.as_view(), name='owner-facilities'),
     path('facility/create/', CreateFacilityAPIView.as_view(), name='create-facility'),
     path('facility/<uuid:pk>/', FacilityDetailAPIView.as_view(), name='facility'),
+    path('facility/<uuid:pk>/calendar/', FacilityCalendarAPIView.as_view(), name='facility-calendar'),
+    path('facility/<uuid:pk>/ratings/', FacilityRatingsAPIView.as_view(), name='facility-ratings'),
+    path('facility/<uuid:pk>/similar/', SimilarFacilitiesAPIView.as_view(), name='similar-facilities'),
+    path('availability/', FacilityAvailabilityAPIView.as_view(), name='facility-availability'),
     path('amenity/create/', AddAmenityAPIView.as_view(), name='create-amenity'),
     path('amenity/<uuid:pk>/', AmenityDetailAPIView.as_view(), name='amenity'),
     path('image/create/', AddFacilityImageAPIView.as_view(), name='create-image'),
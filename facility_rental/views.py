@@ -1,10 +1,19 @@
 import json
-from rest_framework import generics, status
+import datetime
+from collections import Counter
+from django.core.cache import cache
+from django.db.models.functions import Greatest
+from rest_framework import generics, status, serializers
 from django_filters import rest_framework as filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from usAHA_backend import geo
+from usAHA_backend.conditional import ConditionalGetMixin
+from usAHA_backend.query_budget import QueryBudgetMixin
+from .documents import render_documents
+from .cache import DETAIL_TIMEOUT, FACETS_TIMEOUT, TOP_FEED_TIMEOUT, detail_key, facets_key, top_feed_key
 from .models import *
 from .serializers import *
 
@@ -41,25 +50,39 @@ class CreateFacilityAPIView(generics.CreateAPIView):
             except json.JSONDecodeError:
                 amenities = [amenities]
 
-        for amenity in amenities:
-            Amenity.objects.create(
-                facility=new_facility,
-                name=amenity.get('name')
-            )
+        Amenity.objects.bulk_create([
+            Amenity(facility=new_facility, name=amenity.get('name'))
+            for amenity in amenities
+        ])
+        sync_amenity_names(new_facility.pk)
         serializer = self.get_serializer(new_facility)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class FacilityDetailAPIView(APIView):
+class FacilityDetailAPIView(ConditionalGetMixin, APIView):
+    surrogate_key_field = 'uuid'
+    surrogate_key_prefix = 'facility'
+
+    def get_validator_queryset(self):
+        return Facility.objects.filter(pk=self.kwargs['pk'])
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
         return [IsAuthenticated()]
     
     def get(self, request, pk, format=None):
+        key = detail_key(pk)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
         try:
-            facility = Facility.objects.get(pk=pk)
-            serializer = FacilitySerializer(facility)
-            return Response(serializer.data)
+            facility = Facility.objects.select_related('document').get(pk=pk)
+            rendered = render_documents([facility])
+            if not rendered:
+                raise Facility.DoesNotExist
+            data = rendered[0]
+            cache.set(key, data, DETAIL_TIMEOUT)
+            return Response(data)
         except Facility.DoesNotExist:
             return Response({"message": "Facility not found"}, status=status.HTTP_404_NOT_FOUND)
     
@@ -86,24 +109,163 @@ class FacilityFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
     category = filters.CharFilter(field_name='category', lookup_expr='exact')
     owner = filters.CharFilter(field_name='owner__id', lookup_expr='exact')
+    city = filters.CharFilter(field_name='city', lookup_expr='iexact')
+    min_price = filters.NumberFilter(field_name='price_per_day', lookup_expr='gte')
+    max_price = filters.NumberFilter(field_name='price_per_day', lookup_expr='lte')
+    start_date = filters.DateFilter(method='filter_available')
+    end_date = filters.DateFilter(method='filter_available')
+    q = filters.CharFilter(method='filter_search')
+    amenities = filters.CharFilter(method='filter_amenities')
+    near = filters.CharFilter(method='filter_near')
+    radius = filters.NumberFilter(method='filter_near')
 
     class Meta:
         model = Facility
-        fields = ['name', 'category', 'owner']
-
-class FacilitiesListAPIView(generics.ListAPIView):
+        fields = ['name', 'category', 'owner', 'city', 'min_price', 'max_price',
+                  'start_date', 'end_date', 'q', 'amenities', 'near', 'radius']
+
+    def filter_near(self, queryset, name, value):
+        # radius only scales near, so it is applied there.
+        if name == 'radius':
+            return queryset
+        coordinates = geo.parse_point(self.form.cleaned_data.get('near'))
+        if coordinates is None:
+            raise serializers.ValidationError({"near": ['Expected "latitude,longitude".']})
+        radius = self.form.cleaned_data.get('radius') or geo.DEFAULT_RADIUS_KM
+        if not 0 < radius <= geo.MAX_RADIUS_KM:
+            raise serializers.ValidationError({"radius": [f"Radius must be between 0 and {geo.MAX_RADIUS_KM} km."]})
+        return queryset.near(*coordinates, float(radius))
+
+    def filter_amenities(self, queryset, name, value):
+        names = [amenity for amenity in value.split(',') if amenity.strip()]
+        return queryset.with_amenities(names) if names else queryset
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value) if value.strip() else queryset
+
+    def filter_available(self, queryset, name, value):
+        start_date = self.form.cleaned_data.get('start_date')
+        end_date = self.form.cleaned_data.get('end_date')
+        if name == 'end_date' and start_date:
+            return queryset
+        start_date, end_date = start_date or end_date, end_date or start_date
+        if end_date < start_date:
+            raise serializers.ValidationError({"end_date": ["End date cannot be before start date."]})
+        return queryset.available_between(start_date, end_date)
+
+class FacilityDocumentListMixin:
+    """Renders each page from the stored facility documents instead of FacilitySerializer."""
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_paginated_response(render_documents(page, request))
+
+class FacilitiesListAPIView(ConditionalGetMixin, QueryBudgetMixin, FacilityDocumentListMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
-    queryset = Facility.objects.all()
+    queryset = Facility.objects.select_related('document')
+    query_budget = 3
+    surrogate_key = 'facilities'
+    surrogate_key_field = 'uuid'
+    surrogate_key_prefix = 'facility'
+    # Availability depends on bookings, which do not touch Facility.updated_at.
+    unconditional_params = ('start_date', 'end_date')
     serializer_class = FacilitySerializer
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = FacilityFilter
 
-class OwnerFacilitiesAPIView(generics.ListAPIView):
+class FacilityFacetsAPIView(APIView):
+    """Counts per category, city and price bucket for the same filters the facility list takes."""
+    permission_classes = [AllowAny]
+    # Availability changes with every booking, which does not bump the cache version.
+    uncached_filters = ('start_date', 'end_date')
+
+    def get(self, request, *args, **kwargs):
+        filterset = FacilityFilter(request.query_params, queryset=Facility.objects.all(), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        cacheable = not any(request.query_params.get(name) for name in self.uncached_filters)
+        key = facets_key(request.query_params, filterset.filters)
+        facets = cache.get(key) if cacheable else None
+        if facets is None:
+            facets = self.count(filterset.qs.facet_counts())
+            if cacheable:
+                cache.set(key, facets, FACETS_TIMEOUT)
+        return Response(facets)
+
+    def count(self, rows):
+        categories, buckets, cities = Counter(), Counter(), {}
+        for row in rows:
+            categories[row['category']] += row['count']
+            buckets[row['bucket']] += row['count']
+            city = cities.setdefault(row['city_key'], {"value": row['city_key'], "label": row['city_label'], "count": 0})
+            city['label'] = min(city['label'], row['city_label'])
+            city['count'] += row['count']
+
+        return {
+            "total": sum(categories.values()),
+            "category": [{"value": value, "label": label, "count": categories[value]}
+                         for value, label in Facility.CATEGORY_CHOICES],
+            "city": sorted(cities.values(), key=lambda city: (-city['count'], city['value'])),
+            "price": [{"min": low, "max": high, "count": buckets[index]}
+                      for index, (low, high) in enumerate(PRICE_BUCKETS)],
+        }
+
+class TopFacilitiesAPIView(QueryBudgetMixin, APIView):
+    """Home feed: the best-rated facilities of every category."""
+    permission_classes = [AllowAny]
+    query_budget = 4
+    max_limit = 20
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', 6))
+        except ValueError:
+            return Response({"message": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < limit <= self.max_limit:
+            return Response({"message": f"limit must be between 1 and {self.max_limit}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        key = top_feed_key(limit)
+        feed = cache.get(key)
+        if feed is None:
+            # One serializer call, so the owners' profile cards load in a single batch.
+            facilities = FacilitySerializer(Facility.objects.for_listing().top_per_category(limit), many=True).data
+            by_category = {value: [] for value, _ in Facility.CATEGORY_CHOICES}
+            for facility in facilities:
+                by_category.setdefault(facility['category'], []).append(facility)
+            feed = [
+                {"category": value, "label": label, "facilities": by_category[value]}
+                for value, label in Facility.CATEGORY_CHOICES
+            ]
+            cache.set(key, feed, TOP_FEED_TIMEOUT)
+        return Response(feed)
+
+class FacilityNearestAPIView(APIView):
+    permission_classes = [AllowAny]
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        coordinates = geo.parse_point(request.query_params.get('near'))
+        if coordinates is None:
+            return Response({"message": 'near must be "latitude,longitude".'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({"message": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < limit <= self.max_limit:
+            return Response({"message": f"limit must be between 1 and {self.max_limit}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        facilities = Facility.objects.for_listing().nearest(*coordinates, limit)
+        return Response(FacilitySerializer(facilities, many=True).data)
+
+class OwnerFacilitiesAPIView(QueryBudgetMixin, FacilityDocumentListMixin, generics.ListAPIView):
     serializer_class = FacilitySerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
-        return Facility.objects.filter(owner=self.request.user)
+        return Facility.objects.select_related('document').filter(owner=self.request.user)
 
 class AddAmenityAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -213,19 +375,21 @@ class FacilityBookingFilter(filters.FilterSet):
         model = Facility_Booking
         fields = ['facility__uuid', 'booker__id']
 
-class FacilityBookingsListAPIView(generics.ListAPIView):
+class FacilityBookingsListAPIView(QueryBudgetMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
-    queryset = Facility_Booking.objects.all()
+    queryset = Facility_Booking.objects.for_feed()
+    query_budget = 3
     serializer_class = FacilityBookingSerializer
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = FacilityBookingFilter
 
-class UserFacilityBookingsAPIView(generics.ListAPIView):
+class UserFacilityBookingsAPIView(QueryBudgetMixin, generics.ListAPIView):
     serializer_class = FacilityBookingSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     def get_queryset(self):
-        return Facility_Booking.objects.filter(booker=self.request.user)
+        return Facility_Booking.objects.for_feed().filter(booker=self.request.user)
 
 class BookingDetailAPIView(APIView):
     def get_permissions(self):
@@ -235,7 +399,7 @@ class BookingDetailAPIView(APIView):
 
     def get(self, request, pk, format=None):
         try:
-            booking = Facility_Booking.objects.get(pk=pk)
+            booking = Facility_Booking.objects.for_feed().get(pk=pk)
             serializer = FacilityBookingSerializer(booking)
             return Response(serializer.data)
         except Facility_Booking.DoesNotExist:
@@ -311,9 +475,123 @@ class FacilityReviewFilter(filters.FilterSet):
         model = FacilityReview
         fields = ['facility__uuid', 'user__id']
 
-class FacilityReviewsListAPIView(generics.ListAPIView):
+class FacilityReviewsListAPIView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
-    queryset = FacilityReview.objects.all()
+    queryset = FacilityReview.objects.select_related('facility')
+    surrogate_key = 'reviews'
+    surrogate_key_field = 'facility'
+    surrogate_key_prefix = 'facility'
     serializer_class = FacilityReviewSerializer
     filter_backends = [filters.DjangoFilterBackend]
-    filterset_class = FacilityReviewFilter
\ No newline at end of file
+    filterset_class = FacilityReviewFilter
+
+    def get_last_modified(self):
+        # Rows also show facility_name; reviewer details touch the reviews themselves.
+        return Greatest('updated_at', 'facility__updated_at')
+
+class FacilityAvailabilityAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = FacilityAvailabilitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        facility_ids = list(dict.fromkeys(serializer.validated_data['facilities']))
+        ranges = serializer.validated_data['ranges']
+        booked = {
+            row['pk']: row for row in Facility.objects.filter(pk__in=facility_ids)
+            .with_bookings_in([(r['start_date'], r['end_date']) for r in ranges])
+            .values('pk', *[f"booked_{index}" for index in range(len(ranges))])
+        }
+
+        results = []
+        for facility_id in facility_ids:
+            if facility_id not in booked:
+                continue
+            availability = [
+                {**r, "available": not booked[facility_id][f"booked_{index}"]}
+                for index, r in enumerate(ranges)
+            ]
+            results.append({
+                "facility": facility_id,
+                "available": all(a["available"] for a in availability),
+                "ranges": availability,
+            })
+        not_found = [facility_id for facility_id in facility_ids if facility_id not in booked]
+        return Response({"results": results, "not_found": not_found})
+
+class FacilityCalendarAPIView(APIView):
+    """
+    Booked days of one facility within a window (default: the next 31 days, at most 366).
+    `booked` is a run-length list of [offset, length] pairs counted in days from `start_date`.
+    """
+    permission_classes = [AllowAny]
+    max_days = 366
+
+    def get(self, request, pk, format=None):
+        start_date = request.query_params.get('start_date', datetime.date.today().isoformat())
+        serializer = DateRangeSerializer(data={
+            "start_date": start_date,
+            "end_date": request.query_params.get('end_date', start_date),
+        })
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        start_date = serializer.validated_data['start_date']
+        end_date = serializer.validated_data['end_date']
+        if 'end_date' not in request.query_params:
+            end_date = start_date + datetime.timedelta(days=30)
+        if (end_date - start_date).days >= self.max_days:
+            return Response({"message": f"The window cannot be longer than {self.max_days} days"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        bookings = (Facility_Booking.objects.blocking().filter(facility_id=pk)
+                    .overlapping(start_date, end_date)
+                    .order_by('start_date')
+                    .values_list('start_date', 'end_date'))
+        runs = []
+        for booking_start, booking_end in bookings:
+            first = (max(booking_start, start_date) - start_date).days
+            last = (min(booking_end, end_date) - start_date).days
+            if runs and first <= runs[-1][0] + runs[-1][1]:
+                runs[-1][1] = max(runs[-1][1], last - runs[-1][0] + 1)
+            else:
+                runs.append([first, last - first + 1])
+
+        if not runs and not Facility.objects.filter(pk=pk).exists():
+            return Response({"message": "Facility not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"facility": pk, "start_date": start_date, "end_date": end_date, "booked": runs})
+
+class SimilarFacilitiesAPIView(QueryBudgetMixin, APIView):
+    """Neighbours precomputed by compute_facility_similarity, most similar first."""
+    permission_classes = [AllowAny]
+    query_budget = 5
+
+    def get(self, request, pk, format=None):
+        facilities = list(
+            Facility.objects.for_listing()
+            .filter(similar_to__facility_id=pk)
+            .annotate(similarity=F('similar_to__score'))
+            .order_by('similar_to__rank')
+        )
+        if not facilities and not Facility.objects.filter(pk=pk).exists():
+            return Response({"message": "Facility not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        data = FacilitySerializer(facilities, many=True).data
+        for item, facility in zip(data, facilities):
+            item['similarity'] = round(facility.similarity, 4)
+        return Response(data)
+
+class FacilityRatingsAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk, format=None):
+        row = Facility.objects.filter(pk=pk).values('rating', 'rating_count', *RATING_HISTOGRAM_FIELDS).first()
+        if row is None:
+            return Response({"message": "Facility not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "facility": pk,
+            "rating": row['rating'],
+            "count": row['rating_count'],
+            "histogram": {str(score): row[f"rating_hist_{score}"] for score in range(6)},
+        })
@@ -1,11 +1,13 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from facility_rental.models import *
 import uuid
 
+HOLD_EXPIRED_MESSAGE = "The hold on this booking has expired."
+
 class Payment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="payments")
@@ -21,13 +23,21 @@ class Payment(models.Model):
     method = models.CharField(max_length=50, choices=PAYMENT_METHOD_CHOICES, default='debit')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='payment_user_created_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         booking = self.booking
         self.total_amount = booking.duration * booking.facility.price_per_day
-        super(Payment, self).save(*args, **kwargs)
-
-@receiver(post_save, sender=Payment)
-def update_booking_paid_status(sender, instance, **kwargs):
-    booking = instance.booking
-    booking.is_paid = True
-    booking.save()
+        with transaction.atomic():
+            if self._state.adding:
+                # Checked and confirmed in one UPDATE, so the hold sweeper cannot release
+                # the booking between the expiry check and the payment.
+                confirmed = (Facility_Booking.objects.filter(pk=booking.pk).blocking()
+                             .update(is_paid=True, hold_expires_at=None))
+                if not confirmed:
+                    raise ValidationError({"booking": HOLD_EXPIRED_MESSAGE})
+                booking.is_paid, booking.hold_expires_at = True, None
+            super(Payment, self).save(*args, **kwargs)
@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import *
 
@@ -9,7 +10,15 @@ class PaymentSerializer(serializers.ModelSerializer):
         extra_kwargs = {"id": {"read_only": True}, "user": {"read_only": True}, 
                         "total_amount_at": {"read_only": True}, "created_at": {"read_only": True}}
         
+    def validate_booking(self, value):
+        if value.is_hold_expired:
+            raise serializers.ValidationError(HOLD_EXPIRED_MESSAGE)
+        return value
+
     def create(self, validated_data):
         user = self.context.get('user')
-        payment = Payment.objects.create(user=user, **validated_data)
+        try:
+            payment = Payment.objects.create(user=user, **validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
         return payment
\ No newline at end of file
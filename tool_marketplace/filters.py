@@ -1,12 +1,50 @@
 from django_filters import rest_framework as filters
+from rest_framework import serializers
+from rest_framework.filters import OrderingFilter, SearchFilter
+from usAHA_backend import geo
 from .models import Tool
 
 class ToolFilter(filters.FilterSet):
     category = filters.CharFilter(method='filter_by_category')
+    category_all = filters.CharFilter(method='filter_by_all_categories')
+    near = filters.CharFilter(method='filter_near')
+    radius = filters.NumberFilter(method='filter_near')
 
     class Meta:
         model = Tool
-        fields = ['user_id', 'uuid', 'price_per_unit', 'category']
+        fields = ['user_id', 'uuid', 'price_per_unit', 'category', 'category_all', 'near', 'radius']
 
     def filter_by_category(self, queryset, name, value):
-        return queryset.filter(category__name=value)
+        # Comma-separated names; a tool matches if it is in any of them.
+        names = [category.strip() for category in value.split(',') if category.strip()]
+        return queryset.in_any_category(names) if names else queryset
+
+    def filter_by_all_categories(self, queryset, name, value):
+        names = [category.strip() for category in value.split(',') if category.strip()]
+        return queryset.in_all_categories(names) if names else queryset
+
+    def filter_near(self, queryset, name, value):
+        if name == 'radius':
+            return queryset
+        coordinates = geo.parse_point(self.form.cleaned_data.get('near'))
+        if coordinates is None:
+            raise serializers.ValidationError({"near": ['Expected "latitude,longitude".']})
+        radius = self.form.cleaned_data.get('radius') or geo.DEFAULT_RADIUS_KM
+        if not 0 < radius <= geo.MAX_RADIUS_KM:
+            raise serializers.ValidationError({"radius": [f"Radius must be between 0 and {geo.MAX_RADIUS_KM} km."]})
+        return queryset.near(*coordinates, float(radius))
+
+class ToolSearchFilter(SearchFilter):
+    """Ranked full-text search on Tool.search_vector instead of ILIKE over each search field."""
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return queryset.search(" ".join(terms))
+
+class ToolOrderingFilter(OrderingFilter):
+    """Orders search results by relevance unless the client asks for another ordering."""
+    def get_default_ordering(self, view):
+        if ToolSearchFilter().get_search_terms(view.request):
+            return ['-rank']
+        return super().get_default_ordering(view)
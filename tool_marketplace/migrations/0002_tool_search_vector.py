@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_marketplace', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tool_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE tool_marketplace_tool AS t
+                SET search_vector =
+                    setweight(to_tsvector('simple', t.name), 'A')
+                    || setweight(to_tsvector('simple', t.description), 'B')
+                    || setweight(to_tsvector('simple', COALESCE(
+                        (SELECT string_agg(c.name, ' ')
+                         FROM tool_marketplace_tool_category AS tc
+                         JOIN tool_marketplace_toolcategory AS c ON c.uuid = tc.toolcategory_id
+                         WHERE tc.tool_id = t.uuid), ''
+                    )), 'C');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
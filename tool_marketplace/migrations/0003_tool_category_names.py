@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:30
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_marketplace', '0002_tool_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='category_names',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['category_names'], name='tool_category_names_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE tool_marketplace_tool AS t
+                SET category_names = (
+                    SELECT array_agg(c.name ORDER BY c.name)
+                    FROM tool_marketplace_tool_category AS tc
+                    JOIN tool_marketplace_toolcategory AS c ON c.uuid = tc.toolcategory_id
+                    WHERE tc.tool_id = t.uuid
+                )
+                WHERE EXISTS (
+                    SELECT 1 FROM tool_marketplace_tool_category AS tc WHERE tc.tool_id = t.uuid
+                );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
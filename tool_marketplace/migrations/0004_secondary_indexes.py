@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_marketplace', '0003_tool_category_names'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['name', 'uuid'], name='tool_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['user_id', 'name', 'uuid'], name='tool_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='toolreceipt',
+            index=models.Index(fields=['user_id', 'is_paid', '-order_date'], name='receipt_user_paid_date_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.conf import settings
+from django.db import migrations, models
+from usAHA_backend import geo
+
+
+def locate_tools(apps, schema_editor):
+    Tool = apps.get_model('tool_marketplace', 'Tool')
+    located = []
+    for row in Tool.objects.only('location_link').iterator():
+        coordinates = geo.parse_coordinates(row.location_link)
+        if coordinates:
+            row.latitude, row.longitude = coordinates
+            row.geohash = geo.encode_geohash(*coordinates)
+            located.append(row)
+    Tool.objects.bulk_update(located, ['latitude', 'longitude', 'geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_marketplace', '0004_secondary_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=9),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['geohash'], name='tool_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(locate_tools, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool_marketplace', '0005_tool_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
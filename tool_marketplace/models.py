@@ -1,7 +1,21 @@
 from django.db import models
+from django.db.models import F, OuterRef, Value
+from django.db.models.functions import Cast
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from authentication.models import CustomUser
+from usAHA_backend import geo
+import re
 import uuid
 
+SEARCH_CONFIG = 'simple'
+WEBSEARCH_OPERATORS = re.compile(r'"|(?:^|\s)-|\bor\b', re.IGNORECASE)
+
 class ToolCategory(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -9,6 +23,27 @@ class ToolCategory(models.Model):
     def __str__(self):
         return self.name
 
+class ToolQuerySet(models.QuerySet):
+    def in_any_category(self, names):
+        return self.filter(category_names__overlap=names)
+
+    def in_all_categories(self, names):
+        return self.filter(category_names__contains=names)
+
+    def near(self, latitude, longitude, radius_km):
+        return geo.near(self, latitude, longitude, radius_km)
+
+    def search(self, text):
+        """Full-text matches, best first. Plain queries also match word prefixes ("sa" finds "saw")."""
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        terms = re.findall(r'[^\W_]+', text)
+        # Quotes, "-" and "or" are websearch operators; prefix terms would undo them.
+        if terms and not WEBSEARCH_OPERATORS.search(text):
+            query |= SearchQuery(" & ".join(f"{term}:*" for term in terms), config=SEARCH_CONFIG, search_type='raw')
+        return (self.filter(search_vector=query)
+                .annotate(rank=Cast(SearchRank(F('search_vector'), query), models.FloatField()))
+                .order_by('-rank'))
+
 class Tool(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4)
     user_id = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
@@ -17,7 +52,33 @@ class Tool(models.Model):
     description = models.TextField()
     price_per_unit = models.IntegerField()
     location_link = models.CharField(max_length=255)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=geo.GEOHASH_PRECISION, blank=True, default='', editable=False)
     stock = models.IntegerField()
+    # Mirror of the category names, kept in sync from m2m_changed.
+    category_names = ArrayField(models.CharField(max_length=255), default=list, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ToolQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['category_names'], name='tool_category_names_idx'),
+            GinIndex(fields=['search_vector'], name='tool_search_vector_idx'),
+            models.Index(fields=['name', 'uuid'], name='tool_name_idx'),
+            models.Index(fields=['user_id', 'name', 'uuid'], name='tool_user_name_idx'),
+            models.Index(fields=['geohash'], name='tool_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def save(self, *args, **kwargs):
+        geo.locate(self)
+        # category_names and search_vector are written by signals only.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in ('category_names', 'search_vector')]
+        super().save(*args, **kwargs)
 
 class ToolImage(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -37,4 +98,64 @@ class ToolReceipt(models.Model):
     is_paid = models.BooleanField(default=False)
     receipt_code = models.CharField(max_length=255, default='')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'is_paid', '-order_date'], name='receipt_user_paid_date_idx'),
+        ]
+
+def build_search_vector(category_text):
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(category_text, weight='C', config=SEARCH_CONFIG)
+    )
+
+def category_text():
+    return models.Func(F('category_names'), Value(' '), function='ARRAY_TO_STRING', output_field=models.TextField())
+
+def sync_categories(tools):
+    """Copy the tools' categories into category_names and their search vectors, in two UPDATEs."""
+    names = ArraySubquery(ToolCategory.objects.filter(tools=OuterRef('pk')).order_by('name').values('name'))
+    tools.update(category_names=names, updated_at=timezone.now())
+    # SET expressions see the pre-update row, so the vector needs its own pass.
+    tools.update(search_vector=build_search_vector(category_text()))
+
+@receiver(post_init, sender=Tool)
+def remember_tool_location(sender, instance, **kwargs):
+    geo.remember_location(instance)
+
+@receiver(post_save, sender=Tool)
+def update_tool_search_vector(sender, instance, **kwargs):
+    Tool.objects.filter(pk=instance.pk).update(search_vector=build_search_vector(category_text()))
+
+@receiver(post_save, sender=ToolImage)
+@receiver(post_delete, sender=ToolImage)
+def touch_tool_on_image_change(sender, instance, **kwargs):
+    Tool.objects.filter(pk=instance.tool_id).update(updated_at=timezone.now())
+
+@receiver(m2m_changed, sender=Tool.category.through)
+def update_tool_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_categories(Tool.objects.filter(pk=instance.pk))
+        return
+    # Changed from the category side: pk_set holds tool keys, except on clear.
+    if action == 'pre_clear':
+        instance._cleared_tool_ids = list(instance.tools.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        sync_categories(Tool.objects.filter(pk__in=instance._cleared_tool_ids))
+    elif action in ('post_add', 'post_remove'):
+        sync_categories(Tool.objects.filter(pk__in=pk_set))
+
+@receiver(post_save, sender=ToolCategory)
+def update_tool_categories_on_rename(sender, instance, created, **kwargs):
+    if not created:
+        sync_categories(instance.tools.all())
+
+@receiver(pre_delete, sender=ToolCategory)
+def remember_category_tools(sender, instance, **kwargs):
+    instance._cleared_tool_ids = list(instance.tools.values_list('pk', flat=True))
 
+@receiver(post_delete, sender=ToolCategory)
+def update_tool_categories_on_delete(sender, instance, **kwargs):
+    sync_categories(Tool.objects.filter(pk__in=instance._cleared_tool_ids))
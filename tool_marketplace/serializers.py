@@ -15,13 +15,21 @@ class ToolImageSerializer(serializers.ModelSerializer):
 class ToolsSerializer(serializers.ModelSerializer):
     category = serializers.SerializerMethodField()
     images = ToolImageSerializer(many=True, read_only=True)
+    distance = serializers.SerializerMethodField()
 
     class Meta:
         model = Tool
-        fields = ['uuid', 'name', 'description', 'price_per_unit', 'location_link', 'stock', 'user_id', 'category', 'images']
+        fields = ['uuid', 'name', 'description', 'price_per_unit', 'location_link', 'latitude', 'longitude',
+                  'distance', 'stock', 'user_id', 'category', 'images']
+        extra_kwargs = {"latitude": {"min_value": -90, "max_value": 90},
+                        "longitude": {"min_value": -180, "max_value": 180}}
 
     def get_category(self, obj):
-        return [category.name for category in obj.category.all()]
+        return obj.category_names
+
+    def get_distance(self, obj):
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 2) if distance is not None else None
 
 class ToolReceiptSerializer(serializers.ModelSerializer):
     receipt_code = serializers.CharField(allow_blank=True, required=False)
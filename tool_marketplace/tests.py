@@ -1,3 +1,62 @@
-from django.test import TestCase
+import itertools
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from authentication.models import CustomUser
+from .models import *
 
-# Create your tests here.
+_counter = itertools.count()
+
+def make_tool(user, **kwargs):
+    number = next(_counter)
+    tool = Tool.objects.create(user_id=user, name=kwargs.pop('name', f"Tool {number}"), description="Sharp",
+                               price_per_unit=kwargs.pop('price_per_unit', 10), location_link="", stock=1, **kwargs)
+    tool.category.add(*ToolCategory.objects.all())
+    for index in range(2):
+        ToolImage.objects.create(tool=tool, image=f"tool_images/{number}-{index}.jpg", is_primary=index == 0)
+    return tool
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ToolListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(username="owner", email="owner@example.com")
+        ToolCategory.objects.create(name="power")
+        ToolCategory.objects.create(name="hand")
+
+    def test_constant_queries(self):
+        make_tool(self.user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/tools/')
+        self.assertEqual(len(response.json()['results']), 1)
+
+        for _ in range(7):
+            make_tool(self.user)
+        cache.clear()
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/tools/')
+        self.assertEqual(len(response.json()['results']), 8)
+
+class ToolPaginationTests(TestCase):
+    def test_round_trip_with_price_ties(self):
+        user = CustomUser.objects.create(username="owner", email="owner@example.com")
+        for index in range(7):
+            make_tool(user, price_per_unit=index // 3)
+        pages, url = [], '/tools/?ordering=price_per_unit&page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            pages.append([(row['price_per_unit'], row['uuid']) for row in data['results']])
+            url, previous_url = data['next'], data['previous']
+        rows = [row for page in pages for row in page]
+        self.assertEqual(len({uuid for _, uuid in rows}), 7)
+        self.assertEqual([price for price, _ in rows], sorted(price for price, _ in rows))
+
+        back = [pages[-1]]
+        while previous_url:
+            data = self.client.get(previous_url).json()
+            back.insert(0, [(row['price_per_unit'], row['uuid']) for row in data['results']])
+            previous_url = data['previous']
+        self.assertEqual(back, pages)
@@ -9,18 +9,24 @@ from rest_framework.response import Response
 from rest_framework import generics, filters
 
 from authentication.models import CustomUser
-from tool_marketplace.filters import ToolFilter
+from tool_marketplace.filters import ToolFilter, ToolOrderingFilter, ToolSearchFilter
 from tool_marketplace.models import Tool, ToolCategory, ToolImage, ToolReceipt
 from tool_marketplace.serializers import ToolCategorySerializer, ToolReceiptSerializer, ToolsSerializer
+from usAHA_backend.conditional import ConditionalGetMixin
+from usAHA_backend.query_budget import QueryBudgetMixin
 
-class getTools(generics.ListAPIView):
+class getTools(ConditionalGetMixin, QueryBudgetMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
-    queryset = Tool.objects.all()
+    queryset = Tool.objects.prefetch_related('images')
+    query_budget = 4
+    surrogate_key = 'tools'
+    surrogate_key_field = 'uuid'
+    surrogate_key_prefix = 'tool'
     
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ToolSearchFilter, ToolOrderingFilter]
     filterset_class = ToolFilter
-    search_fields = ['name', 'description']
     ordering_fields = ['name', 'price_per_unit']
+    ordering = ['name']
 
     serializer_class = ToolsSerializer
 
@@ -59,14 +65,15 @@ class createTool(generics.CreateAPIView):
                 categories = [categories] 
 
 
+        category_instances = list(ToolCategory.objects.filter(name__in=categories))
+        found = {category.name for category in category_instances}
         for category in categories:
-            try:
-                category_instance = ToolCategory.objects.get(name=category)
-                new_tool.category.add(category_instance)
-            except ToolCategory.DoesNotExist:
+            if category not in found:
                 print(f"Category not found: {category}")
+        new_tool.category.add(*category_instances)
 
         new_tool.save()
+        new_tool.refresh_from_db(fields=['category_names'])
 
         serializer = self.get_serializer(new_tool)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -92,6 +99,7 @@ class getCategories(generics.ListAPIView):
     permission_classes = [AllowAny]
     queryset = ToolCategory.objects.all()
     serializer_class = ToolCategorySerializer
+    ordering = ['name']
 
 class buyTool(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -102,6 +110,7 @@ class getReceipts(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     queryset = ToolReceipt.objects.all()
     serializer_class = ToolReceiptSerializer
+    ordering = ['-order_date']
 
     filterset_fields = ['user_id', 'tool_id', 'is_paid']
 
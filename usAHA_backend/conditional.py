@@ -0,0 +1,105 @@
+import hashlib
+from django.db.models import Count, F, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validation and shared-cache headers for public reads.
+
+    List views validate on the page being requested: the page query runs once
+    with just each row's key and modification time, and the ETag hashes those
+    pairs with the full request path, so edits, inserts and deletes that touch
+    the page all change it. Lists send no Last-Modified, since a deleted row
+    would not move it. Single-object views validate on the newest modification
+    time and row count of `get_validator_queryset()`.
+
+    A matching If-None-Match or If-Modified-Since gets a 304 before the handler
+    runs, so nothing is serialized. Successful responses carry Cache-Control
+    and a Surrogate-Key header for per-object purges at the proxy.
+    """
+    last_modified_field = 'updated_at'
+    cache_max_age = 60
+    surrogate_key = None
+    # Per-object keys "<prefix>-<value>", taken from this field of each result.
+    surrogate_key_field = None
+    surrogate_key_prefix = None
+    # Query parameters whose results depend on rows not covered by the validators.
+    unconditional_params = ()
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_last_modified(self):
+        """A row's modification time; override to fold in related rows that the payload shows."""
+        return F(self.last_modified_field)
+
+    def get_validators(self):
+        queryset = self.get_validator_queryset().annotate(validator_modified=self.get_last_modified())
+        paginator = getattr(self, 'paginator', None)
+        if paginator is None:
+            row = queryset.order_by().aggregate(last_modified=Max('validator_modified'), count=Count('pk'))
+            if not row['count']:
+                return None
+            return self.make_etag(f"{row['last_modified'].isoformat()}|{row['count']}"), row['last_modified']
+
+        rows = paginator.paginate_queryset(
+            queryset.select_related(None).prefetch_related(None).only('pk'), self.request, view=self)
+        if not rows:
+            return None
+        links = (getattr(paginator, 'has_next', None), getattr(paginator, 'has_previous', None))
+        return self.make_etag(f"{links}|" + ";".join(f"{row.pk}:{row.validator_modified.isoformat()}" for row in rows)), None
+
+    def make_etag(self, state):
+        return '"%s"' % hashlib.md5(f"{self.request.get_full_path()}|{state}".encode('utf-8')).hexdigest()
+
+    def get_surrogate_keys(self, response):
+        keys = [self.surrogate_key] if self.surrogate_key else []
+        if self.surrogate_key_field:
+            data = response.data
+            results = data.get('results', [data]) if isinstance(data, dict) else data
+            keys += sorted({f"{self.surrogate_key_prefix}-{item[self.surrogate_key_field]}" for item in results})
+        return keys
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        if any(request.query_params.get(param) for param in self.unconditional_params):
+            return
+
+        self.validators = self.get_validators()
+        if self.validators is not None:
+            etag, last_modified = self.validators
+            # HTTP dates have whole-second resolution.
+            response = get_conditional_response(
+                request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators is None or response.status_code not in (200, 304):
+            return response
+
+        etag, last_modified = validators
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = f"public, max-age={self.cache_max_age}"
+        if response.status_code == 200:
+            keys = self.get_surrogate_keys(response)
+            if keys:
+                response['Surrogate-Key'] = " ".join(keys)
+        return response
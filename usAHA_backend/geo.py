@@ -0,0 +1,159 @@
+import math
+import re
+from functools import reduce
+from operator import or_
+from urllib.parse import parse_qs, urlparse
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
+_NUMBER = r'(-?\d{1,3}(?:\.\d+)?)'
+_LINK_PATTERNS = [
+    re.compile(rf'!3d{_NUMBER}!4d{_NUMBER}'),  # Google Maps place pin
+    re.compile(rf'@{_NUMBER},\s*{_NUMBER}'),   # Google Maps viewport centre
+]
+_POINT = re.compile(rf'^\s*{_NUMBER}\s*,\s*{_NUMBER}\s*$')
+_QUERY_PARAMS = ('q', 'query', 'll', 'center', 'destination', 'daddr')
+
+def _valid(latitude, longitude):
+    latitude, longitude = float(latitude), float(longitude)
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+        return latitude, longitude
+    return None
+
+def parse_point(text):
+    """Parse "lat,lng" into a (latitude, longitude) pair, or None."""
+    match = _POINT.match(text or '')
+    return _valid(*match.groups()) if match else None
+
+def parse_coordinates(link):
+    """Best-effort (latitude, longitude) from a maps URL or a plain "lat,lng", or None."""
+    if not link:
+        return None
+    for pattern in _LINK_PATTERNS:
+        match = pattern.search(link)
+        if match:
+            return _valid(*match.groups())
+    query = parse_qs(urlparse(link).query)
+    for param in _QUERY_PARAMS:
+        for value in query.get(param, []):
+            point = parse_point(value)
+            if point:
+                return point
+    return parse_point(link)
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, interval = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+def cell_size_km(precision, latitude):
+    """Height and width in km of a geohash cell at the given precision and latitude."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    height = 180 / 2 ** lat_bits * math.pi * EARTH_RADIUS_KM / 180
+    width = 360 / 2 ** lng_bits * math.pi * EARTH_RADIUS_KM / 180 * math.cos(math.radians(latitude))
+    return height, width
+
+def neighbour_cells(latitude, longitude, radius_km):
+    """
+    The geohash cell containing the point plus its eight neighbours, at the finest
+    precision whose cells are at least radius_km across, so together they cover
+    every point within the radius. None when the radius is too large for any
+    precision to help.
+    """
+    # Cells narrow towards the poles, so size them at the poleward edge of the circle.
+    edge_latitude = min(90.0, abs(latitude) + math.degrees(radius_km / EARTH_RADIUS_KM))
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_km(precision, edge_latitude)
+        if min(height, width) >= radius_km:
+            break
+    else:
+        return None
+
+    lat_step = 180 / 2 ** (5 * precision // 2)
+    lng_step = 360 / 2 ** ((5 * precision + 1) // 2)
+    cells = set()
+    for dy in (-1, 0, 1):
+        lat = latitude + dy * lat_step
+        if not -90 <= lat <= 90:
+            continue
+        for dx in (-1, 0, 1):
+            lng = (longitude + dx * lng_step + 180) % 360 - 180
+            cells.add(encode_geohash(lat, lng, precision))
+    return cells
+
+def _location(instance):
+    return tuple(instance.__dict__.get(field) for field in ('location_link', 'latitude', 'longitude'))
+
+def remember_location(instance):
+    """Note the location as loaded, so locate() can tell what a save changed."""
+    instance._stored_location = _location(instance)
+
+def locate(instance):
+    """
+    Fill latitude, longitude and geohash on a model from its location_link where
+    possible. When the link changes to one without coordinates and none were
+    given explicitly, the old coordinates no longer apply and are cleared.
+    """
+    coordinates = parse_coordinates(instance.location_link)
+    stored_link, stored_latitude, stored_longitude = getattr(instance, '_stored_location', (None, None, None))
+    if coordinates:
+        instance.latitude, instance.longitude = coordinates
+    elif (instance.location_link != stored_link
+          and (instance.latitude, instance.longitude) == (stored_latitude, stored_longitude)):
+        instance.latitude = instance.longitude = None
+    remember_location(instance)
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.geohash = encode_geohash(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ''
+
+def distance_km(latitude, longitude):
+    """Haversine distance in km from the point to each row's latitude/longitude, as a query expression."""
+    half_dlat = Radians(F('latitude') - Value(latitude)) / 2
+    half_dlng = Radians(F('longitude') - Value(longitude)) / 2
+    a = (Power(Sin(half_dlat), 2)
+         + Cos(Radians(Value(latitude))) * Cos(Radians(F('latitude'))) * Power(Sin(half_dlng), 2))
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(Value(1.0), a, output_field=FloatField())))
+
+def near(queryset, latitude, longitude, radius_km):
+    """Rows within radius_km of the point, nearest first, with a `distance` annotation in km."""
+    cells = neighbour_cells(latitude, longitude, radius_km)
+    if cells is None:
+        queryset = queryset.exclude(geohash='')
+    else:
+        queryset = queryset.filter(reduce(or_, (Q(geohash__startswith=cell) for cell in sorted(cells))))
+    return (queryset.annotate(distance=distance_km(latitude, longitude))
+            .filter(distance__lte=radius_km)
+            .order_by('distance'))
+
+def nearest(queryset, latitude, longitude, count, radius_km=5):
+    """The `count` rows nearest to the point, widening the search until enough are found."""
+    max_radius_km = math.pi * EARTH_RADIUS_KM
+    while True:
+        if neighbour_cells(latitude, longitude, radius_km) is None:
+            radius_km = max_radius_km
+        rows = list(near(queryset, latitude, longitude, radius_km)[:count])
+        if len(rows) >= count or radius_km >= max_radius_km:
+            return rows
+        radius_km *= 4
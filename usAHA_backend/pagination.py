@@ -0,0 +1,139 @@
+import datetime
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else f"-{field}"
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+def _get_value(obj, field):
+    value = obj
+    for attr in field.lstrip('-').split('__'):
+        value = getattr(value, attr)
+    return _encode_value(value)
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor keyset pagination.
+
+    The cursor carries the ordering values of the row at the page boundary and
+    the next page is fetched with a WHERE on them rather than an OFFSET, so page
+    N costs the same as page 1. The primary key is always appended to the
+    ordering as a tiebreaker.
+
+    Ordering comes from the view's OrderingFilter when it has one, then from an
+    order_by() a filter already applied (e.g. search relevance), then from
+    `view.ordering`, and finally defaults to newest first on created_at.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor['reverse']
+
+        ordering = [_flip(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(self.keyset_filter(ordering, self.cursor['position']))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+        if not ordering and queryset.query.order_by:
+            ordering = queryset.query.order_by
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        ordering = list(ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not {field.lstrip('-') for field in ordering} & {'pk', pk_name}:
+            ordering.append(f"-{pk_name}" if ordering[0].startswith('-') else pk_name)
+        return ordering
+
+    def keyset_filter(self, ordering, position):
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y), with > and <
+        # swapped for descending fields. The OR alone is not an index
+        # condition, so it is ANDed with a >= x that the index can seek on.
+        condition = Q()
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f"{field.lstrip('-')}__{lookup}": position[index]})
+            for previous, value in zip(ordering[:index], position):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+        leading = ordering[0]
+        bound = Q(**{f"{leading.lstrip('-')}__{'lte' if leading.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse, ordering = cursor['p'], bool(cursor['r']), cursor['o']
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': reverse}
+
+    def encode_cursor(self, obj, reverse):
+        cursor = {
+            'p': [_get_value(obj, field) for field in self.ordering],
+            'r': int(reverse),
+            'o': self.ordering,
+        }
+        encoded = urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
@@ -0,0 +1,40 @@
+import logging
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+class QueryBudgetMixin:
+    """
+    Declares how many SQL queries a view may run per request (authentication included).
+    Going over the budget is logged, and raises QueryBudgetExceeded when
+    settings.QUERY_BUDGET_STRICT is on (the default under `manage.py test` and pytest).
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+
+        if counter.count > self.query_budget:
+            message = (f"{self.__class__.__name__} ran {counter.count} queries, "
+                       f"budget is {self.query_budget}")
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
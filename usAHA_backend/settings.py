@@ -2,6 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import sys
 
 load_dotenv()
 
@@ -28,6 +29,8 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'usAHA_backend.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 # Application definition
@@ -39,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'storages',
@@ -48,6 +52,7 @@ INSTALLED_APPS = [
     'facility_rental',
     'tool_marketplace',
     'payment',
+    'autocomplete',
 ]
 
 MIDDLEWARE = [
@@ -110,6 +115,18 @@ DATABASES = {
 #     }
 # }
 
+# The LocMemCache default is only for development and tests. It is per
+# process, so cache invalidation does not reach other workers: any deployment
+# with more than one process must set CACHE_BACKEND to a shared cache (e.g.
+# django.core.cache.backends.redis.RedisCache). `manage.py check --deploy`
+# fails until it does.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'usaha'),
+    }
+}
+
 AUTH_USER_MODEL = 'authentication.CustomUser'
 
 # Password validation
@@ -168,4 +185,26 @@ AWS_S3_REGION_NAME = 'ap-southeast-2'
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL =  None
 AWS_S3_VERITY = True
-DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
\ No newline at end of file
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'usAHA_backend.storage.CachedURLS3Storage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+# Signed media URLs are reused until this many seconds before they expire.
+MEDIA_URL_CACHE_MARGIN = int(os.getenv('MEDIA_URL_CACHE_MARGIN', 1200))
+MEDIA_URL_CACHE_SIZE = int(os.getenv('MEDIA_URL_CACHE_SIZE', 10000))
+
+# Unpaid bookings reserve their dates for this long before the sweeper releases them.
+BOOKING_HOLD_TTL = timedelta(minutes=int(os.getenv('BOOKING_HOLD_MINUTES', 15)))
+
+# Views declaring a query_budget raise instead of logging when they go over it.
+RUNNING_TESTS = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', str(RUNNING_TESTS)) == 'True'
+
+# Per-process cache of users resolved from JWT cookies.
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', 1024))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', 60))
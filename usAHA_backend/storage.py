@@ -0,0 +1,34 @@
+from django.conf import settings
+from storages.backends.s3boto3 import S3Boto3Storage
+from .lru import TTLCache
+
+class CachedURLS3Storage(S3Boto3Storage):
+    """
+    S3 storage that reuses signed URLs instead of presigning on every `.url` access.
+
+    URLs are cached per (bucket, key) for the signature lifetime minus
+    MEDIA_URL_CACHE_MARGIN seconds. The margin has to cover anything that keeps
+    a URL around afterwards (the facility detail and feed caches, HTTP caches),
+    so that a URL is never handed out after its signature has expired.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        margin = getattr(settings, 'MEDIA_URL_CACHE_MARGIN', 1200)
+        self.url_cache = TTLCache(maxsize=getattr(settings, 'MEDIA_URL_CACHE_SIZE', 10000),
+                                  ttl=max(self.querystring_expire - margin, 0))
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if parameters or http_method or (expire is not None and expire != self.querystring_expire) \
+                or not self.url_cache.ttl:
+            return super().url(name, parameters=parameters, expire=expire, http_method=http_method)
+
+        key = (self.bucket_name, name)
+        url = self.url_cache.get(key)
+        if url is None:
+            url = super().url(name)
+            self.url_cache.set(key, url)
+        return url
+
+    def delete(self, name):
+        super().delete(name)
+        self.url_cache.delete((self.bucket_name, name))
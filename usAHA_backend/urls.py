@@ -6,4 +6,5 @@ urlpatterns = [
     path('facilities/', include('facility_rental.urls')),
     path('tools/', include('tool_marketplace.urls')),
     path('payments/', include('payment.urls')),
+    path('autocomplete/', include('autocomplete.urls')),
 ]
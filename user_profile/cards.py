@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+CARD_TIMEOUT = 3600
+
+def card_key(user_id):
+    return f"profile_card:{user_id}"
+
+def get_profile_cards(user_ids):
+    """
+    Public display fields {name, pfp_url, joined} for many users: one cache
+    round trip, plus one query for whatever is not cached. Users without a
+    profile get a card with no name or picture.
+
+    The picture is cached as its storage key and signed here, so a cached card
+    never holds an expired URL.
+    """
+    user_ids = {str(user_id) for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    cached = cache.get_many([card_key(user_id) for user_id in user_ids])
+    cards = {user_id: cached[card_key(user_id)] for user_id in user_ids if card_key(user_id) in cached}
+
+    missing = user_ids - cards.keys()
+    if missing:
+        rows = get_user_model().objects.filter(pk__in=missing).values(
+            'pk', 'date_joined', 'profile__pk', 'profile__first_name', 'profile__last_name', 'profile__profile_pic')
+        fetched = {
+            str(row['pk']): {
+                "name": f"{row['profile__first_name']} {row['profile__last_name']}" if row['profile__pk'] else None,
+                "pfp": row['profile__profile_pic'] or None,
+                "joined": row['date_joined'],
+            }
+            for row in rows
+        }
+        cache.set_many({card_key(user_id): card for user_id, card in fetched.items()}, CARD_TIMEOUT)
+        cards.update(fetched)
+
+    return {
+        user_id: {"name": card["name"],
+                  "pfp_url": default_storage.url(card["pfp"]) if card["pfp"] else None,
+                  "joined": card["joined"]}
+        for user_id, card in cards.items()
+    }
+
+def get_profile_card(user_id):
+    return get_profile_cards([user_id]).get(str(user_id))
+
+def invalidate_profile_card(user_id):
+    key = card_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
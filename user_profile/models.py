@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cards import invalidate_profile_card
 import uuid
 
 class Profile(models.Model):
@@ -13,3 +16,13 @@ class Profile(models.Model):
 
     def __str__(self):
         return self.user.username
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_card_on_profile_change(sender, instance, **kwargs):
+    invalidate_profile_card(instance.user_id)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_card_on_user_change(sender, instance, **kwargs):
+    invalidate_profile_card(instance.pk)
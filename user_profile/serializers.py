@@ -1,4 +1,6 @@
+from django.db import models
 from rest_framework import serializers
+from .cards import get_profile_card, get_profile_cards
 from .models import Profile
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -20,3 +22,23 @@ class ProfilePicSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = ['profile_pic']
+
+class ProfileCardListSerializer(serializers.ListSerializer):
+    """Loads the profile cards of a whole page in one batch before rendering its rows."""
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(items)
+        field = self.child.card_user_field
+        self.child.profile_cards = get_profile_cards(getattr(item, field) for item in items)
+        return super().to_representation(items)
+
+class ProfileCardMixin:
+    """Serializer mixin giving access to the profile card of the user in `card_user_field`."""
+    card_user_field = 'user_id'
+
+    def get_card(self, obj):
+        user_id = str(getattr(obj, self.card_user_field))
+        cards = getattr(self, 'profile_cards', None)
+        if cards is not None and user_id in cards:
+            return cards[user_id]
+        return get_profile_card(user_id) or {"name": None, "pfp_url": None, "joined": None}
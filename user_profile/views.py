@@ -23,6 +23,7 @@ class ProfileListAPIView(generics.ListAPIView):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     filterset_class = ProfileFilter
+    ordering = ['first_name', 'last_name']
 
 class EditProfilePicAPIView(APIView):
     permission_classes = [IsAuthenticated]